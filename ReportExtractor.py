@@ -8,49 +8,127 @@
 # To get to xml, one has to decode string using base64, and then decompress it with zlib.
 import argparse
 import json
-import base64
-import zlib
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
 
-parser = argparse.ArgumentParser()
-parser.add_argument("file", type=str, help="")
-args = parser.parse_args()
+# pybase64 wraps libbase64's SIMD decoders; the stdlib module is a drop-in fallback.
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# isal_zlib (Intel ISA-L) is an API-compatible, faster inflate; stdlib zlib is the fallback.
+try:
+    from isal import isal_zlib as zlib
+except ImportError:
+    import zlib
+
+# orjson parses UTF-8 bytes directly; stdlib json.loads accepts bytes as well.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# ijson streams transferDetails one entry at a time instead of loading the whole transport.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Buffer size for writing report files.
+WRITE_BUFFER_SIZE = 256 * 1024
+
+# Inflate in bounded 1 MiB output chunks appended to one growing bytearray.
+ZLIB_CHUNK_SIZE = 1 << 20
+# 32 + MAX_WBITS: accept either a zlib or a gzip header.
+ZLIB_AUTO_WBITS = 32 + 15
+
+def inflate(data):
+    decompressor = zlib.decompressobj(ZLIB_AUTO_WBITS)
+    out = bytearray()
+    extend = out.extend
+    while data:
+        extend(decompressor.decompress(data, ZLIB_CHUNK_SIZE))
+        if decompressor.eof:
+            break
+        data = decompressor.unconsumed_tail
+    extend(decompressor.flush())
+    return out
 
 def getXMLfromContent(content):
+    # Dispatch on the first character so the common TRUE### case costs one prefix
+    # check; the prefix is still confirmed since base64 itself may start with T or F.
     compress = False
-    if content.startswith("TRUE###"):
+    first = content[:1]
+    if first == "T" and content.startswith("TRUE###"):
         real_content = content[7:]
         compress = True
-    elif content.startswith("FALSE###"):
+    elif first == "F" and content.startswith("FALSE###"):
         real_content = content[8:]
     else:
         real_content = content
-    byte_decoded = base64.b64decode(real_content)
+    byte_decoded = base64.b64decode(real_content.encode("ascii"), validate=False)
     if compress:
-        byte_decompressed = zlib.decompress(byte_decoded)
+        byte_decompressed = inflate(byte_decoded)
     else:
         byte_decompressed = byte_decoded
-    object_json = json.loads(byte_decompressed.decode("utf8"))
+    object_json = json_loads(byte_decompressed)
     return object_json["transferableContent"]["content"]
 
+def getTransferDetails(jfile):
+    if ijson is not None:
+        return ijson.items(jfile, "transferDetails.item")
+    return json.load(jfile)["transferDetails"]
 
-with open(args.file, encoding="utf-8") as jfile:
-    transport = json.load(jfile)
 
-path=os.path.basename(jfile.name)+ "_Reports";
-print("Extracting the following reports into folder: " + path );
-try:
-    if not os.path.exists(path):
-	    os.mkdir(path)
-except OSError:
-    print ("Creation of the directory %s failed" % path )
-   
-
-for k in transport["transferDetails"]:
-    if k["transferObject"]["summary"]["type"] == "report":
-        rname = k["transferObject"]["summary"]["name"]
-        xml = getXMLfromContent(k["transferObject"]["content"])
+def _process_report(rname, content):
+    return rname, getXMLfromContent(content).encode("utf-8")
+
+
+def _write(target, data):
+    with open(target, "wb", buffering=WRITE_BUFFER_SIZE) as ofile:
+        ofile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file", type=str, help="")
+    args = parser.parse_args()
+
+    path=os.path.basename(args.file)+ "_Reports";
+    print("Extracting the following reports into folder: " + path );
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        print ("Creation of the directory %s failed" % path )
+
+    # Each report decodes independently, so fan them out across processes. Only a
+    # bounded number of reports is in flight, which keeps the ijson streaming benefit.
+    # Files are written by a small thread pool so disk latency overlaps decoding.
+    max_pending = 2 * (os.cpu_count() or 1)
+    pending = deque()
+    writes = deque()
+
+    def finish_oldest():
+        rname, data = pending.popleft().result()
+        writes.append(writer.submit(_write, os.path.join(path, "{}.xml".format(rname)), data))
+        if len(writes) >= max_pending:
+            writes.popleft().result()
         print("\t{}".format(rname))
- #       print(xml)
-        with open(path+"\{}.xml".format(rname), "w", encoding="utf-8") as ofile:
-            ofile.write(xml)
+
+    with ProcessPoolExecutor() as ex, ThreadPoolExecutor(max_workers=4) as writer, \
+            open(args.file, "rb") as jfile:
+        for k in getTransferDetails(jfile):
+            if k["transferObject"]["summary"]["type"] == "report":
+                rname = k["transferObject"]["summary"]["name"]
+                pending.append(ex.submit(_process_report, rname, k["transferObject"]["content"]))
+                if len(pending) >= max_pending:
+                    finish_oldest()
+        while pending:
+            finish_oldest()
+        while writes:
+            writes.popleft().result()
+
+if __name__ == "__main__":
+    main()
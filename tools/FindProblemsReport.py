@@ -1,40 +1,40 @@
 import re
-import xml.etree.ElementTree as ET
 import sys
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 
 if len(sys.argv) < 2:
     print("Usage: python FindProblemsReport.py <input_file>")
     sys.exit(1)
 
 input_file = sys.argv[1]
-tree = ET.parse(input_file)
-root = tree.getroot()
-idcheck = re.compile('[a-z]{2}[0-9]+')
+idtoken = re.compile(r'(?<!\S)[a-z]{2}[0-9]+\S*')  # whitespace-delimited tokens starting with an ID
 idintext = re.compile('(?<![A-Za-z0-9#])[a-z]{2}[0-9]+')
 idUsed = set()
 idReferenced = set()
 idDups = set()
+# Bound methods looked up once instead of on every element
+findIdTokens = idtoken.finditer
+findIdsInText = idintext.findall
+addReference = idReferenced.add
 
-# First pass: collect all IDs used in name attributes
-for el in root.iter():
+# Single streaming pass: collect IDs used in name attributes and all references.
+# Each element is cleared once processed so memory stays flat on large reports.
+for ev, el in ET.iterparse(input_file, events=('end',)):
     name = el.get('name')
     if name:  # Only consider elements with a name attribute
         if name in idUsed:
             idDups.add(name)
         idUsed.add(name)
-
-# Second pass: collect all references
-for el in root.iter():
     for k,v in el.attrib.items():
         if k != 'name':  # Skip name attributes as they're not references
-            for word in v.split():
-                if re.match(idcheck,word) is not None:
-                    idReferenced.add(word)
+            for m in findIdTokens(v):
+                addReference(m.group(0))
     if el.text is not None:
-        results = re.findall(idintext,el.text)
-        if results is not None:
-            for found in results:
-                idReferenced.add(found)
+        idReferenced.update(findIdsInText(el.text))
+    el.clear()
 
 print("Null candidates: ", idReferenced.difference(idUsed))
 print("Known false positives include labels, html colors")
@@ -1,8 +1,15 @@
-import xml.etree.ElementTree as ET
 import re
 import sys
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import DefaultDict, Dict, List, Set, Tuple
+
+try:
+    from lxml import etree as ET
+    HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAVE_LXML = False
 
 """fix_report_xml.py
 
@@ -42,10 +49,19 @@ unchanged.
 
 NAME_RE = re.compile(r"^[a-z]+\d+$")  # matches dd123 etc.
 ID_IN_TEXT_RE = re.compile(r"(?<![A-Za-z0-9#])([a-z]+\d+)")
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+ET_XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>"
+NS_PREFIX_RE = re.compile(r"ns\d+:")
+# A tag (group 1) or a run of text between tags (group 2) in serialized output.
+SERIALIZED_TOKEN_RE = re.compile(r"(<[^>]*>)|([^<]+)")
+OUTPUT_BUFFER_SIZE = 1 << 20
 
 
 def build_parent_map(root: ET.Element) -> Dict[ET.Element, ET.Element]:
-    """Return a mapping *child -> parent* for every element in *root*."""
+    """Return a mapping *child -> parent* for every element in *root*.
+
+    Only needed with the ElementTree fallback; lxml provides ``getparent()``.
+    """
     return {child: parent for parent in root.iter() for child in parent}
 
 
@@ -57,35 +73,39 @@ def collect_ids(root: ET.Element):
     root : ET.Element
         Root element of the parsed XML tree.
     """
-    id_used: Dict[str, List[ET.Element]] = {}
+    id_used: DefaultDict[str, List[ET.Element]] = defaultdict(list)
     id_referenced: Set[str] = set()
     id_dups: Set[str] = set()
 
-    # Pass 1 – collect all ids used as *name* attributes.
+    # Bound methods hoisted out of the per-element loop.
+    add_reference = id_referenced.add
+    update_references = id_referenced.update
+    find_ids_in_text = ID_IN_TEXT_RE.findall
+    name_match = NAME_RE.match
+
+    # Single pass – collect ids used as *name* attributes together with all
+    # ids referenced outside *name* attributes.
     for el in root.iter():
         name = el.get("name")
         if name:
-            id_used.setdefault(name, []).append(el)
-            if len(id_used[name]) > 1:
+            elements = id_used[name]
+            elements.append(el)
+            if len(elements) > 1:
                 id_dups.add(name)
-
-    # Pass 2 – collect all ids referenced outside *name* attributes.
-    for el in root.iter():
         # attributes
-        for attr, val in el.attrib.items():
+        for attr, val in el.items():
             if attr == "name":
                 continue
-            # A single attribute might contain many ids (space-separated or
-            # embedded inside longer tokens such as dd123.bi4)
-            for match in re.finditer(NAME_RE, val):
-                id_referenced.add(match.group(0))
-        # element text
+            # NAME_RE is anchored, so only a value that is a whole id counts
+            # (not tokens such as dd123.bi4); one match call is enough.
+            match = name_match(val)
+            if match is not None:
+                add_reference(match.group(0))
+        # element text and tail; findall + update keeps the per-match work in C
         if el.text:
-            for match in ID_IN_TEXT_RE.finditer(el.text):
-                id_referenced.add(match.group(1))
+            update_references(find_ids_in_text(el.text))
         if el.tail:
-            for match in ID_IN_TEXT_RE.finditer(el.tail):
-                id_referenced.add(match.group(1))
+            update_references(find_ids_in_text(el.tail))
 
     return id_used, id_referenced, id_dups
 
@@ -94,9 +114,13 @@ def collect_ids(root: ET.Element):
 # Core functionality
 # ----------------------------------------------------------------------------
 
-def fix_duplicates(root: ET.Element) -> int:
-    """For every duplicate name=..., rename only the second and subsequent elements using nextUniqueNameIndex. Do not update any references. Only increment nextUniqueNameIndex if a new name is used."""
-    id_used, _, id_dups = collect_ids(root)
+def fix_duplicates(root: ET.Element, ids=None) -> int:
+    """For every duplicate name=..., rename only the second and subsequent elements using nextUniqueNameIndex. Do not update any references. Only increment nextUniqueNameIndex if a new name is used.
+
+    *ids* is an optional result of :func:`collect_ids` for *root*; it is
+    updated in place to reflect the renames so it can be reused afterwards.
+    """
+    id_used, _, id_dups = ids if ids is not None else collect_ids(root)
     if not id_dups:
         return 0
 
@@ -105,30 +129,44 @@ def fix_duplicates(root: ET.Element) -> int:
     changed = 0
     for dup_name in sorted(id_dups):
         elements = id_used[dup_name]
+        kept = elements[:1]
         # Keep the first element unchanged, rename the rest.
         for el in elements[1:]:
             prefix_match = re.match(r"[a-z]+", dup_name)
             if not prefix_match:
+                kept.append(el)
                 continue
             prefix = prefix_match.group(0)
             new_name = f"{prefix}{next_unique}"
             next_unique += 1
             el.set("name", new_name)
+            id_used.setdefault(new_name, []).append(el)
             changed += 1
+        id_used[dup_name] = kept
+        if len(kept) == 1:
+            id_dups.discard(dup_name)
     if changed:
         root.set("nextUniqueNameIndex", str(next_unique))
     return changed
 
 
-def remove_unused_prompts(root: ET.Element) -> int:
+def remove_unused_prompts(root: ET.Element, ids=None) -> int:
     """Remove prompt definitions that are not referenced.
 
+    Parameters
+    ----------
+    root : ET.Element
+        Root element of the parsed XML tree.
+    ids : tuple, optional
+        Result of :func:`collect_ids` for *root*, reused instead of walking
+        the tree again.
+
     Returns
     -------
     int
         Number of prompt elements removed.
     """
-    id_used, id_referenced, _ = collect_ids(root)
+    id_used, id_referenced, _ = ids if ids is not None else collect_ids(root)
 
     unused_prompts = {
         pid for pid in id_used.keys()
@@ -137,40 +175,55 @@ def remove_unused_prompts(root: ET.Element) -> int:
     if not unused_prompts:
         return 0
 
-    # Build a mapping of child -> parent to support removal.
-    parent_map = build_parent_map(root)
+    # lxml elements know their parent; ElementTree needs a child -> parent map.
+    parent_of = (lambda el: el.getparent()) if HAVE_LXML else build_parent_map(root).get
 
     removed = 0
     for prompt_id in unused_prompts:
         # Remove all elements with this name attribute (normally one, but be safe)
         for el in id_used[prompt_id]:
-            parent = parent_map.get(el)
+            parent = parent_of(el)
             if parent is not None:
                 parent.remove(el)
                 removed += 1
     return removed
 
 
-def extract_cdata_blocks(xml_text):
-    """Return a list of (start, end, content) for all CDATA sections in xml_text."""
-    cdata_blocks = []
-    for match in re.finditer(r'<!\[CDATA\[(.*?)\]\]>', xml_text, re.DOTALL):
-        cdata_blocks.append((match.start(), match.end(), match.group(0)))
-    return cdata_blocks
-
+def fix_all(root: ET.Element) -> Tuple[int, int]:
+    """Run both repairs from a single :func:`collect_ids` traversal.
 
-def remove_nonoriginal_cdata(xml_str, original_cdata_blocks):
-    """Remove all CDATA sections from xml_str except those that match the original CDATA blocks."""
-    # Build a set of original CDATA contents for fast lookup
-    original_cdata_set = set(block[2] for block in original_cdata_blocks)
-    def cdata_replacer(match):
-        cdata = match.group(0)
-        if cdata in original_cdata_set:
-            return cdata
-        # Otherwise, return just the text content (no CDATA)
-        return match.group(1)
-    # Replace all CDATA blocks
-    return re.sub(r'<!\[CDATA\[(.*?)\]\]>', cdata_replacer, xml_str, flags=re.DOTALL)
+    Returns
+    -------
+    tuple of int
+        Number of renamed duplicate elements and number of prompt elements
+        removed.
+    """
+    ids = collect_ids(root)
+    return fix_duplicates(root, ids), remove_unused_prompts(root, ids)
+
+
+def _fixup_token(match) -> str:
+    tag = match.group(1)
+    if tag is not None:
+        # Double-quoted declaration, default namespace instead of ns0:,
+        # no space before "/>"
+        if tag == ET_XML_DECLARATION:
+            return XML_DECLARATION
+        tag = NS_PREFIX_RE.sub("", tag).replace("xmlns:ns0=", "xmlns=")
+        return tag.replace(" />", "/>")
+    # Text: &apos; for apostrophes. ElementTree drops CDATA wrappers; former
+    # CDATA content stays escaped, as unescaping it would break the markup.
+    text = NS_PREFIX_RE.sub("", match.group(2))
+    return text.replace("'", "&apos;").replace(" />", "/>")
+
+
+def fixup_serialized(xml_str: str) -> str:
+    """Rewrite ElementTree output to match the formatting of the original report.
+
+    All fixups are applied in a single forward pass over tags and text runs
+    instead of one full-document pass per rewrite.
+    """
+    return SERIALIZED_TOKEN_RE.sub(_fixup_token, xml_str)
 
 
 # ----------------------------------------------------------------------------
@@ -190,65 +243,31 @@ def main():
         Path(sys.argv[2]) if len(sys.argv) > 2 else input_path.with_name(input_path.stem + "_fixed.xml")
     )
 
-    # Read the original XML as text to extract CDATA blocks
-    with open(input_path, "r", encoding="utf-8") as f:
-        original_xml_text = f.read()
-    cdata_blocks = extract_cdata_blocks(original_xml_text)
-
-    # Register namespace so it is preserved when writing.
-    ET.register_namespace("", "http://www.sas.com/sasreportmodel/bird-4.1.4")
+    if HAVE_LXML:
+        # lxml keeps the default namespace as parsed; keep CDATA sections too.
+        parser = ET.XMLParser(strip_cdata=False)
+    else:
+        # Register namespace so it is preserved when writing.
+        ET.register_namespace("", "http://www.sas.com/sasreportmodel/bird-4.1.4")
+        parser = None
 
-    tree = ET.parse(str(input_path))
+    tree = ET.parse(str(input_path), parser)
     root = tree.getroot()
 
-    removed_duplicates = fix_duplicates(root)
-    removed_prompts = remove_unused_prompts(root)
+    removed_duplicates, removed_prompts = fix_all(root)
 
     # Write XML with formatting to match fixed_report.xml
-    xml_bytes = ET.tostring(root, encoding="utf-8", xml_declaration=True)
-    xml_str = xml_bytes.decode("utf-8")
-    # Remove namespace prefixes like ns0:
-    xml_str = re.sub(r"ns\d+:", "", xml_str)
-    # Replace single quotes in XML declaration with double quotes
-    xml_str = re.sub(r"<\?xml version='1.0' encoding='utf-8'\?>", "<?xml version=\"1.0\" encoding=\"UTF-8\"?>", xml_str)
-    # Use default namespace (xmlns=) instead of xmlns:ns0=
-    xml_str = re.sub(r'xmlns:ns0=','xmlns=', xml_str)
-    # Remove ns0: from element tags if any remain
-    xml_str = xml_str.replace('ns0:', '')
-    # Use &apos; for apostrophes in text content (but not in attribute values)
-    def replace_apos_in_text(match):
-        text = match.group(1)
-        return '>' + text.replace("'", "&apos;") + '<'
-    xml_str = re.sub(r'>([^<]*?)<', replace_apos_in_text, xml_str)
-    # Convert &lt; and &gt; in text nodes back to < and > (but not inside CDATA)
-    def unescape_angle_brackets(match):
-        text = match.group(1)
-        return '>' + text.replace('&lt;', '<').replace('&gt;', '>') + '<'
-    xml_str = re.sub(r'>([^<]*?)<', unescape_angle_brackets, xml_str)
-    # Remove the space that precedes all self-closing tags
-    xml_str = re.sub(r' \/>', '/>', xml_str)
-
-    # Remove any new CDATA sections added by the serializer, except the original ones
-    xml_str = remove_nonoriginal_cdata(xml_str, cdata_blocks)
-    # Restore original CDATA blocks at their positions
-    def restore_cdata_blocks(xml_str, cdata_blocks):
-        # Replace any CDATA-looking blocks in xml_str with the originals from cdata_blocks
-        # (Assume the number and order of CDATA blocks is the same)
-        def cdata_replacer(match):
-            nonlocal cdata_idx
-            if cdata_idx < len(cdata_blocks):
-                cdata = cdata_blocks[cdata_idx][2]
-                cdata_idx += 1
-                return cdata
-            return match.group(0)
-        cdata_idx = 0
-        # Replace all CDATA blocks in the output with the originals
-        return re.sub(r'<!\[CDATA\[.*?\]\]>', cdata_replacer, xml_str, flags=re.DOTALL)
-
-    xml_str = restore_cdata_blocks(xml_str, cdata_blocks)
-
-    with open(output_path, "w", encoding="utf-8", newline="\n") as fh:
-        fh.write(xml_str)
+    if HAVE_LXML:
+        # lxml writes the default namespace and the original CDATA sections as
+        # parsed, so the tree is streamed straight into a buffered file.
+        with open(output_path, "wb", buffering=OUTPUT_BUFFER_SIZE) as fh:
+            fh.write(XML_DECLARATION.encode("ascii") + b"\n")
+            tree.write(fh, encoding="UTF-8")
+    else:
+        xml_bytes = ET.tostring(root, encoding="utf-8", xml_declaration=True)
+        xml_str = fixup_serialized(xml_bytes.decode("utf-8"))
+        with open(output_path, "w", encoding="utf-8", newline="\n", buffering=OUTPUT_BUFFER_SIZE) as fh:
+            fh.write(xml_str)
 
     print(f"Processed '{input_path.name}':")
     if removed_duplicates:
@@ -12,20 +12,374 @@ Analyzes HTTP Archive (HAR) files to detect potential issues including:
 import json
 import argparse
 import sys
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from urllib.parse import urlparse
-import statistics
+
+# orjson is optional; the stdlib json module is used when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson is optional; with it, entries are streamed instead of loading the whole HAR.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+IO_BUFFER_SIZE = 1 << 20  # 1 MiB; HAR files are often hundreds of MB
+
+JSON_ERRORS = (json.JSONDecodeError,)
+if ijson is not None:
+    JSON_ERRORS += (ijson.JSONError,)
+
+SLOW_THRESHOLD = 3000  # 3 seconds
+LARGE_PAYLOAD_SIZE = 1024 * 1024  # 1MB
+DNS_THRESHOLD = 1000  # DNS taking more than 1 second
+CONNECT_THRESHOLD = 2000  # Connection taking more than 2 seconds
+DETAIL_LIMIT = 5  # Example requests kept per finding; counts are always exact
+SCAN_CHUNK_SIZE = 10000  # Entries per worker task when scanning with --jobs
+
+# Security headers every response should carry, and the finding reported when one is absent
+SECURITY_HEADER_DESCRIPTIONS = {
+    'content-security-policy': 'Missing Content-Security-Policy header',
+    'x-frame-options': 'Missing X-Frame-Options header',
+}
+REQUIRED_SECURITY_HEADERS = frozenset(SECURITY_HEADER_DESCRIPTIONS)
+
+# Status classes. Codes 0-599 are looked up in a table built once; anything
+# else (negative, 600 and above) goes through _classify_status.
+STATUS_OTHER, STATUS_OK, STATUS_BLOCKED, STATUS_ERROR = range(4)
+
+def _classify_status(status) -> int:
+    if status >= 400:
+        return STATUS_ERROR
+    if status == 0:
+        return STATUS_BLOCKED
+    if 200 <= status < 300:
+        return STATUS_OK
+    return STATUS_OTHER
+
+_STATUS_BUCKETS = {code: _classify_status(code) for code in range(600)}
+
+# Shared read-only stand-in for absent request/response/timings objects, so
+# lookups on missing parts don't allocate a fresh {} per entry
+_EMPTY = MappingProxyType({})
+
+# Reads the dns and connect timings in one call; raises KeyError if either is absent
+_dns_and_connect = itemgetter('dns', 'connect')
+
+@lru_cache(maxsize=8192)
+def _netloc(url: str) -> str:
+    """Domain of a URL; HAR files repeat URLs heavily, so parses are cached"""
+    return urlparse(url).netloc
+
+@lru_cache(maxsize=8192)
+def _is_http(url: str) -> bool:
+    """Whether a URL uses plain (non-TLS) HTTP"""
+    return url[:7] == 'http://'
+
+def _new_error_group() -> List[Any]:
+    return [0, set(), []]  # [count, methods, example rows]
+
+class HARFormatError(ValueError):
+    """An entry holds a value of the wrong type, e.g. "time": null"""
+    
+    def __init__(self, entry_index: int):
+        super().__init__(entry_index)
+        self.entry_index = entry_index
+    
+    def __str__(self) -> str:
+        return f"unexpected value type in log.entries[{self.entry_index}]"
+
+class _EntryScan:
+    """Findings and statistics accumulated over a run of HAR entries.
+
+    Example requests are stored once as rows of the column lists and findings
+    keep only row indices; rows are added only for entries kept as examples.
+    Scans of consecutive chunks merge, in order, into the same result as a
+    single scan over all of them.
+    """
+    
+    def __init__(self, detail_limit: Optional[int] = DETAIL_LIMIT):
+        self.limit = detail_limit if detail_limit is not None else sys.maxsize
+        self.urls = []  # None when the request has no url
+        self.methods = []
+        self.statuses = []
+        self.times = []
+        self.body_sizes = []
+        self.error_groups = defaultdict(_new_error_group)  # keyed by status
+        self.slow_idx = []
+        self.large_idx = []
+        self.failed_idx = []
+        self.blocked_idx = []
+        self.insecure_idx = []
+        self.dns_idx = []
+        self.dns_times = []
+        self.connect_idx = []
+        self.connect_times = []
+        self.slow_count = self.large_count = self.failed_count = self.blocked_count = 0
+        self.insecure_count = self.dns_count = self.connect_count = 0
+        self.missing_headers = set()
+        self.missing_header_count = 0
+        self.security_order = []  # security finding types in order of first appearance
+        self.total_requests = 0
+        self.total_time = 0
+        self.min_time = float('inf')
+        self.max_time = float('-inf')
+        self.successful_requests = 0
+        self.error_requests = 0
+        self.domains = set()
+    
+    def add_row(self, url, method, status, time, body_size) -> int:
+        self.urls.append(url)
+        self.methods.append(method)
+        self.statuses.append(status)
+        self.times.append(time)
+        self.body_sizes.append(body_size)
+        return len(self.urls) - 1
+    
+    def url(self, i: int, default: str = 'Unknown') -> str:
+        url = self.urls[i]
+        return url if url is not None else default
+    
+    def scan(self, entries: Iterable[Dict[str, Any]]) -> '_EntryScan':
+        """Run every check over the entries in a single pass"""
+        add_row = self.add_row
+        status_buckets = _STATUS_BUCKETS
+        limit = self.limit
+        error_groups = self.error_groups
+        slow_idx = self.slow_idx
+        large_idx = self.large_idx
+        failed_idx = self.failed_idx
+        blocked_idx = self.blocked_idx
+        insecure_idx = self.insecure_idx
+        dns_idx = self.dns_idx
+        dns_times = self.dns_times
+        connect_idx = self.connect_idx
+        connect_times = self.connect_times
+        missing_headers = self.missing_headers
+        security_order = self.security_order
+        domains = self.domains
+        slow_count = self.slow_count
+        large_count = self.large_count
+        failed_count = self.failed_count
+        blocked_count = self.blocked_count
+        insecure_count = self.insecure_count
+        dns_count = self.dns_count
+        connect_count = self.connect_count
+        missing_header_count = self.missing_header_count
+        total_requests = self.total_requests
+        total_time = self.total_time
+        min_time = self.min_time
+        max_time = self.max_time
+        successful_requests = self.successful_requests
+        error_requests = self.error_requests
+        
+        try:
+            for entry in entries:
+                total_requests += 1
+                request = entry.get('request') or _EMPTY
+                response = entry.get('response') or _EMPTY
+                timings = entry.get('timings') or _EMPTY
+                raw_url = request.get('url')
+                url = raw_url if raw_url is not None else ''
+                method = request.get('method', 'Unknown')
+                status = response.get('status', 0)
+                time = entry.get('time', 0)
+                body_size = response.get('bodySize', 0)
+                row = -1
+                
+                total_time += time
+                if time > max_time:
+                    max_time = time
+                if time < min_time:
+                    min_time = time
+                domains.add(_netloc(url))
+                
+                # Classify the status once: HTTP errors and status 0 (blocked,
+                # e.g. CORS) are both failed resource loads
+                bucket = status_buckets.get(status)
+                if bucket is None:
+                    bucket = _classify_status(status)
+                if bucket == STATUS_ERROR:
+                    error_requests += 1
+                    group = error_groups[status]
+                    group[0] += 1
+                    group[1].add(method)
+                    if len(group[2]) < limit:
+                        row = add_row(raw_url, method, status, time, body_size)
+                        group[2].append(row)
+                    failed_count += 1
+                    if len(failed_idx) < limit:
+                        if row < 0:
+                            row = add_row(raw_url, method, status, time, body_size)
+                        failed_idx.append(row)
+                elif bucket == STATUS_BLOCKED:
+                    failed_count += 1
+                    if len(failed_idx) < limit:
+                        row = add_row(raw_url, method, status, time, body_size)
+                        failed_idx.append(row)
+                    blocked_count += 1
+                    if len(blocked_idx) < limit:
+                        if row < 0:
+                            row = add_row(raw_url, method, status, time, body_size)
+                        blocked_idx.append(row)
+                elif bucket == STATUS_OK:
+                    successful_requests += 1
+                
+                # Slow requests and large payloads
+                if time > SLOW_THRESHOLD:
+                    slow_count += 1
+                    if len(slow_idx) < limit:
+                        if row < 0:
+                            row = add_row(raw_url, method, status, time, body_size)
+                        slow_idx.append(row)
+                if body_size > LARGE_PAYLOAD_SIZE:
+                    large_count += 1
+                    if len(large_idx) < limit:
+                        if row < 0:
+                            row = add_row(raw_url, method, status, time, body_size)
+                        large_idx.append(row)
+                
+                # Check for HTTP (non-HTTPS) requests
+                if _is_http(url):
+                    if not insecure_count:
+                        security_order.append('insecure_protocol')
+                    insecure_count += 1
+                    if len(insecure_idx) < limit:
+                        if row < 0:
+                            row = add_row(raw_url, method, status, time, body_size)
+                        insecure_idx.append(row)
+                
+                # Check for missing security headers
+                headers = response.get('headers') or ()
+                header_names = {h.get('name', '').lower() for h in headers}
+                missing = REQUIRED_SECURITY_HEADERS - header_names
+                if missing:
+                    if not missing_header_count:
+                        security_order.append('missing_security_header')
+                    missing_header_count += len(missing)
+                    for header in missing:
+                        missing_headers.add(SECURITY_HEADER_DESCRIPTIONS[header])
+                
+                # DNS resolution and connection issues
+                try:
+                    dns_time, connect_time = _dns_and_connect(timings)
+                except KeyError:
+                    dns_time = timings.get('dns', -1)
+                    connect_time = timings.get('connect', -1)
+                if dns_time > DNS_THRESHOLD:
+                    dns_count += 1
+                    if len(dns_idx) < limit:
+                        if row < 0:
+                            row = add_row(raw_url, method, status, time, body_size)
+                        dns_idx.append(row)
+                        dns_times.append(dns_time)
+                if connect_time > CONNECT_THRESHOLD:
+                    connect_count += 1
+                    if len(connect_idx) < limit:
+                        if row < 0:
+                            row = add_row(raw_url, method, status, time, body_size)
+                        connect_idx.append(row)
+                        connect_times.append(connect_time)
+            
+        except (AttributeError, TypeError):
+            # Every JSON backend decodes to the same values, so the same entry fails for each
+            raise HARFormatError(total_requests - self.total_requests - 1) from None
+        
+        self.slow_count = slow_count
+        self.large_count = large_count
+        self.failed_count = failed_count
+        self.blocked_count = blocked_count
+        self.insecure_count = insecure_count
+        self.dns_count = dns_count
+        self.connect_count = connect_count
+        self.missing_header_count = missing_header_count
+        self.total_requests = total_requests
+        self.total_time = total_time
+        self.min_time = min_time
+        self.max_time = max_time
+        self.successful_requests = successful_requests
+        self.error_requests = error_requests
+        return self
+    
+    def merge(self, other: '_EntryScan'):
+        """Fold in the scan of the entries that follow this one"""
+        limit = self.limit
+        moved = {}
+        
+        def take(mine: List[int], theirs: List[int], values: Optional[List[Any]] = None,
+                 their_values: Optional[List[Any]] = None):
+            # Copy the other scan's example rows while there is room for them
+            room = limit - len(mine)
+            for n, i in enumerate(theirs[:room]):
+                row = moved.get(i)
+                if row is None:
+                    row = moved[i] = self.add_row(other.urls[i], other.methods[i], other.statuses[i],
+                                                  other.times[i], other.body_sizes[i])
+                mine.append(row)
+                if values is not None:
+                    values.append(their_values[n])
+        
+        for status, (count, methods, rows) in other.error_groups.items():
+            group = self.error_groups[status]
+            group[0] += count
+            group[1] |= methods
+            take(group[2], rows)
+        take(self.failed_idx, other.failed_idx)
+        take(self.blocked_idx, other.blocked_idx)
+        take(self.slow_idx, other.slow_idx)
+        take(self.large_idx, other.large_idx)
+        take(self.insecure_idx, other.insecure_idx)
+        take(self.dns_idx, other.dns_idx, self.dns_times, other.dns_times)
+        take(self.connect_idx, other.connect_idx, self.connect_times, other.connect_times)
+        for issue_type in other.security_order:
+            if issue_type not in self.security_order:
+                self.security_order.append(issue_type)
+        self.missing_headers |= other.missing_headers
+        self.domains |= other.domains
+        self.slow_count += other.slow_count
+        self.large_count += other.large_count
+        self.failed_count += other.failed_count
+        self.blocked_count += other.blocked_count
+        self.insecure_count += other.insecure_count
+        self.dns_count += other.dns_count
+        self.connect_count += other.connect_count
+        self.missing_header_count += other.missing_header_count
+        self.total_requests += other.total_requests
+        self.total_time += other.total_time
+        if other.min_time < self.min_time:
+            self.min_time = other.min_time
+        if other.max_time > self.max_time:
+            self.max_time = other.max_time
+        self.successful_requests += other.successful_requests
+        self.error_requests += other.error_requests
+
+def _scan_chunk(entries: List[Dict[str, Any]], detail_limit: Optional[int]) -> _EntryScan:
+    """Worker-process entry point: scan one chunk of entries"""
+    return _EntryScan(detail_limit).scan(entries)
 
 class HARAnalyzer:
-    def __init__(self, har_data: Dict[str, Any]):
+    def __init__(self, har_data: Dict[str, Any], detail_limit: Optional[int] = DETAIL_LIMIT,
+                 jobs: int = 1):
         self.har_data = har_data
+        self.detail_limit = detail_limit  # None keeps every example
+        self.jobs = jobs  # worker processes for the entry scan; 1 scans in-process
         self.issues = []
         self.stats = {}
         
     def analyze(self) -> List[Dict[str, Any]]:
         """Main analysis function"""
-        if 'log' not in self.har_data:
+        har_log = self.har_data.get('log') if isinstance(self.har_data, dict) else None
+        if not isinstance(har_log, dict):
             self.issues.append({
                 'type': 'error',
                 'severity': 'high',
@@ -35,8 +389,12 @@ class HARAnalyzer:
             })
             return self.issues
             
-        entries = self.har_data['log'].get('entries', [])
-        if not entries:
+        # entries may be a lazy stream, so emptiness is known only after the scan;
+        # anything but an array holds no entries, as when the file is streamed
+        entries = har_log.get('entries')
+        if not isinstance(entries, (list, Iterator)):
+            entries = ()
+        if not self._scan_entries(entries):
             self.issues.append({
                 'type': 'warning',
                 'severity': 'medium',
@@ -44,327 +402,291 @@ class HARAnalyzer:
                 'description': 'No HTTP requests found in the HAR file',
                 'details': 'The HAR file contains no entries to analyze'
             })
-            return self.issues
-            
-        self._analyze_http_errors(entries)
-        self._analyze_performance_issues(entries)
-        self._analyze_security_issues(entries)
-        self._analyze_resource_issues(entries)
-        self._analyze_network_issues(entries)
-        self._generate_statistics(entries)
         
         return self.issues
     
-    def _analyze_http_errors(self, entries: List[Dict[str, Any]]):
-        """Analyze HTTP error responses"""
-        error_entries = []
+    def _scan_entries(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Scan the entries and report the findings; returns the entry count"""
+        if self.jobs > 1:
+            scan = self._scan_parallel(entries)
+        else:
+            scan = _EntryScan(self.detail_limit).scan(entries)
+        if not scan.total_requests:
+            return 0
         
-        for entry in entries:
-            response = entry.get('response', {})
-            status = response.get('status', 0)
-            
-            if status >= 400:
-                error_entries.append({
-                    'url': entry.get('request', {}).get('url', 'Unknown'),
-                    'status': status,
-                    'method': entry.get('request', {}).get('method', 'Unknown'),
-                    'time': entry.get('time', 0),
-                    'size': response.get('bodySize', 0)
-                })
+        # Integer timings with a whole mean stay int, as statistics.mean returned them
+        avg_time, remainder = divmod(scan.total_time, scan.total_requests)
+        if remainder or not isinstance(avg_time, int):
+            avg_time = scan.total_time / scan.total_requests
         
-        if error_entries:
-            # Group by status code
-            status_groups = {}
-            for entry in error_entries:
-                status = entry['status']
-                if status not in status_groups:
-                    status_groups[status] = []
-                status_groups[status].append(entry)
-            
-            for status, entries_list in status_groups.items():
-                self.issues.append({
-                    'type': 'error',
-                    'severity': 'high' if status >= 500 else 'medium',
-                    'title': f'HTTP {status} Errors Detected',
-                    'description': f'Found {len(entries_list)} requests returning HTTP {status} status',
-                    'details': {
-                        'count': len(entries_list),
-                        'urls': [e['url'] for e in entries_list[:5]],  # Show first 5 URLs
-                        'methods': list(set(e['method'] for e in entries_list))
-                    }
-                })
+        self._report_http_errors(scan)
+        self._report_performance_issues(scan, avg_time)
+        self._report_security_issues(scan)
+        self._report_resource_issues(scan)
+        self._report_network_issues(scan)
+        
+        self.stats = {
+            'total_requests': scan.total_requests,
+            'average_response_time': round(avg_time, 2),
+            'max_response_time': scan.max_time,
+            'min_response_time': scan.min_time,
+            'successful_requests': scan.successful_requests,
+            'error_requests': scan.error_requests,
+            'unique_domains': len(scan.domains)
+        }
+        return scan.total_requests
     
-    def _analyze_performance_issues(self, entries: List[Dict[str, Any]]):
-        """Analyze performance-related issues"""
-        response_times = [entry.get('time', 0) for entry in entries]
+    def _scan_parallel(self, entries: Iterable[Dict[str, Any]]) -> _EntryScan:
+        """Scan chunks of entries in worker processes and merge them in order"""
+        scan = _EntryScan(self.detail_limit)
+        entries = iter(entries)
+        pending = deque()  # (index of the chunk's first entry, future)
+        offset = 0
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            while True:
+                chunk = list(islice(entries, SCAN_CHUNK_SIZE))
+                if chunk:
+                    pending.append((offset, executor.submit(_scan_chunk, chunk, self.detail_limit)))
+                    offset += len(chunk)
+                # Keep a bounded number of chunks in flight so streamed HARs stay streamed
+                while pending and (not chunk or len(pending) >= 2 * self.jobs):
+                    first, future = pending.popleft()
+                    try:
+                        scan.merge(future.result())
+                    except HARFormatError as e:
+                        raise HARFormatError(first + e.entry_index) from None
+                if not chunk:
+                    return scan
+    
+    def _report_http_errors(self, scan: _EntryScan):
+        """Report HTTP error responses, grouped by status code"""
+        for status, (count, methods, idx) in scan.error_groups.items():
+            self.issues.append({
+                'type': 'error',
+                'severity': 'high' if status >= 500 else 'medium',
+                'title': f'HTTP {status} Errors Detected',
+                'description': f'Found {count} requests returning HTTP {status} status',
+                'details': {
+                    'count': count,
+                    'urls': [scan.url(i) for i in idx],
+                    'methods': list(methods)
+                }
+            })
+    
+    def _report_performance_issues(self, scan: _EntryScan, avg_time: float):
+        """Report performance-related issues"""
+        if scan.slow_count:
+            self.issues.append({
+                'type': 'performance',
+                'severity': 'medium',
+                'title': 'Slow Response Times Detected',
+                'description': f'Found {scan.slow_count} requests taking longer than {SLOW_THRESHOLD}ms',
+                'details': {
+                    'slow_requests': [
+                        {
+                            'url': scan.url(i),
+                            'time': scan.times[i],
+                            'method': scan.methods[i]
+                        }
+                        for i in scan.slow_idx
+                    ],
+                    'average_response_time': round(avg_time, 2),
+                    'max_response_time': scan.max_time
+                }
+            })
         
-        if response_times:
-            avg_time = statistics.mean(response_times)
-            max_time = max(response_times)
-            slow_threshold = 3000  # 3 seconds
-            
-            # Find slow requests
-            slow_requests = [
-                entry for entry in entries 
-                if entry.get('time', 0) > slow_threshold
-            ]
-            
-            if slow_requests:
+        if scan.large_count:
+            self.issues.append({
+                'type': 'performance',
+                'severity': 'low',
+                'title': 'Large Response Payloads Detected',
+                'description': f'Found {scan.large_count} responses larger than 1MB',
+                'details': {
+                    'large_responses': [
+                        {
+                            'url': scan.url(i),
+                            'size': scan.body_sizes[i],
+                            'method': scan.methods[i]
+                        }
+                        for i in scan.large_idx
+                    ]
+                }
+            })
+    
+    def _report_security_issues(self, scan: _EntryScan):
+        """Report security-related issues"""
+        for issue_type in scan.security_order:
+            if issue_type == 'insecure_protocol':
                 self.issues.append({
-                    'type': 'performance',
-                    'severity': 'medium',
-                    'title': 'Slow Response Times Detected',
-                    'description': f'Found {len(slow_requests)} requests taking longer than {slow_threshold}ms',
+                    'type': 'security',
+                    'severity': 'high',
+                    'title': 'Insecure HTTP Requests Detected',
+                    'description': f'Found {scan.insecure_count} HTTP requests (should use HTTPS)',
                     'details': {
-                        'slow_requests': [
-                            {
-                                'url': entry.get('request', {}).get('url', 'Unknown'),
-                                'time': entry.get('time', 0),
-                                'method': entry.get('request', {}).get('method', 'Unknown')
-                            }
-                            for entry in slow_requests[:5]  # Show first 5
-                        ],
-                        'average_response_time': round(avg_time, 2),
-                        'max_response_time': max_time
+                        'urls': [scan.url(i, '') for i in scan.insecure_idx]
                     }
                 })
-            
-            # Check for large payloads
-            large_payloads = []
-            for entry in entries:
-                response = entry.get('response', {})
-                body_size = response.get('bodySize', 0)
-                if body_size > 1024 * 1024:  # 1MB
-                    large_payloads.append({
-                        'url': entry.get('request', {}).get('url', 'Unknown'),
-                        'size': body_size,
-                        'method': entry.get('request', {}).get('method', 'Unknown')
-                    })
-            
-            if large_payloads:
+            elif issue_type == 'missing_security_header':
                 self.issues.append({
-                    'type': 'performance',
-                    'severity': 'low',
-                    'title': 'Large Response Payloads Detected',
-                    'description': f'Found {len(large_payloads)} responses larger than 1MB',
+                    'type': 'security',
+                    'severity': 'medium',
+                    'title': 'Missing Security Headers',
+                    'description': f'Found {scan.missing_header_count} responses missing security headers',
                     'details': {
-                        'large_responses': large_payloads[:5]  # Show first 5
+                        'missing_headers': list(scan.missing_headers)
                     }
                 })
     
-    def _analyze_security_issues(self, entries: List[Dict[str, Any]]):
-        """Analyze security-related issues"""
-        security_issues = []
-        
-        for entry in entries:
-            request = entry.get('request', {})
-            response = entry.get('response', {})
-            url = request.get('url', '')
-            
-            # Check for HTTP (non-HTTPS) requests
-            if url.startswith('http://') and not url.startswith('https://'):
-                security_issues.append({
-                    'type': 'insecure_protocol',
-                    'url': url,
-                    'description': 'HTTP request detected (should use HTTPS)'
-                })
-            
-            # Check for missing security headers
-            headers = response.get('headers', [])
-            header_names = [h.get('name', '').lower() for h in headers]
-            
-            if 'content-security-policy' not in header_names:
-                security_issues.append({
-                    'type': 'missing_security_header',
-                    'url': url,
-                    'description': 'Missing Content-Security-Policy header'
-                })
-            
-            if 'x-frame-options' not in header_names:
-                security_issues.append({
-                    'type': 'missing_security_header',
-                    'url': url,
-                    'description': 'Missing X-Frame-Options header'
-                })
-        
-        if security_issues:
-            # Group by issue type
-            issue_groups = {}
-            for issue in security_issues:
-                issue_type = issue['type']
-                if issue_type not in issue_groups:
-                    issue_groups[issue_type] = []
-                issue_groups[issue_type].append(issue)
-            
-            for issue_type, issues_list in issue_groups.items():
-                if issue_type == 'insecure_protocol':
-                    self.issues.append({
-                        'type': 'security',
-                        'severity': 'high',
-                        'title': 'Insecure HTTP Requests Detected',
-                        'description': f'Found {len(issues_list)} HTTP requests (should use HTTPS)',
-                        'details': {
-                            'urls': [issue['url'] for issue in issues_list[:5]]
-                        }
-                    })
-                elif issue_type == 'missing_security_header':
-                    self.issues.append({
-                        'type': 'security',
-                        'severity': 'medium',
-                        'title': 'Missing Security Headers',
-                        'description': f'Found {len(issues_list)} responses missing security headers',
-                        'details': {
-                            'missing_headers': list(set(issue['description'] for issue in issues_list))
-                        }
-                    })
-    
-    def _analyze_resource_issues(self, entries: List[Dict[str, Any]]):
-        """Analyze resource loading issues"""
-        failed_resources = []
-        blocked_resources = []
-        
-        for entry in entries:
-            response = entry.get('response', {})
-            status = response.get('status', 0)
-            url = entry.get('request', {}).get('url', '')
-            
-            # Check for failed resource loads
-            if status == 0 or status >= 400:
-                failed_resources.append({
-                    'url': url,
-                    'status': status,
-                    'method': entry.get('request', {}).get('method', 'Unknown')
-                })
-            
-            # Check for blocked resources (CORS, etc.)
-            if status == 0:
-                blocked_resources.append({
-                    'url': url,
-                    'method': entry.get('request', {}).get('method', 'Unknown')
-                })
-        
-        if failed_resources:
+    def _report_resource_issues(self, scan: _EntryScan):
+        """Report resource loading issues"""
+        if scan.failed_count:
             self.issues.append({
                 'type': 'resource',
                 'severity': 'medium',
                 'title': 'Failed Resource Loads',
-                'description': f'Found {len(failed_resources)} failed resource requests',
+                'description': f'Found {scan.failed_count} failed resource requests',
                 'details': {
-                    'failed_resources': failed_resources[:5]  # Show first 5
+                    'failed_resources': [
+                        {
+                            'url': scan.url(i, ''),
+                            'status': scan.statuses[i],
+                            'method': scan.methods[i]
+                        }
+                        for i in scan.failed_idx
+                    ]
                 }
             })
         
-        if blocked_resources:
+        if scan.blocked_count:
             self.issues.append({
                 'type': 'resource',
                 'severity': 'medium',
                 'title': 'Blocked Resource Requests',
-                'description': f'Found {len(blocked_resources)} blocked resource requests (likely CORS issues)',
+                'description': f'Found {scan.blocked_count} blocked resource requests (likely CORS issues)',
                 'details': {
-                    'blocked_resources': blocked_resources[:5]  # Show first 5
+                    'blocked_resources': [
+                        {
+                            'url': scan.url(i, ''),
+                            'method': scan.methods[i]
+                        }
+                        for i in scan.blocked_idx
+                    ]
                 }
             })
     
-    def _analyze_network_issues(self, entries: List[Dict[str, Any]]):
-        """Analyze network connectivity issues"""
-        # Check for DNS resolution issues
-        dns_issues = []
-        connection_issues = []
-        
-        for entry in entries:
-            timings = entry.get('timings', {})
-            url = entry.get('request', {}).get('url', '')
-            
-            # DNS resolution issues
-            dns_time = timings.get('dns', -1)
-            if dns_time > 1000:  # DNS taking more than 1 second
-                dns_issues.append({
-                    'url': url,
-                    'dns_time': dns_time
-                })
-            
-            # Connection issues
-            connect_time = timings.get('connect', -1)
-            if connect_time > 2000:  # Connection taking more than 2 seconds
-                connection_issues.append({
-                    'url': url,
-                    'connect_time': connect_time
-                })
-        
-        if dns_issues:
+    def _report_network_issues(self, scan: _EntryScan):
+        """Report network connectivity issues"""
+        if scan.dns_count:
             self.issues.append({
                 'type': 'network',
                 'severity': 'low',
                 'title': 'Slow DNS Resolution',
-                'description': f'Found {len(dns_issues)} requests with slow DNS resolution (>1s)',
+                'description': f'Found {scan.dns_count} requests with slow DNS resolution (>1s)',
                 'details': {
-                    'slow_dns': dns_issues[:5]  # Show first 5
+                    'slow_dns': [
+                        {'url': scan.url(i, ''), 'dns_time': t}
+                        for i, t in zip(scan.dns_idx, scan.dns_times)
+                    ]
                 }
             })
         
-        if connection_issues:
+        if scan.connect_count:
             self.issues.append({
                 'type': 'network',
                 'severity': 'medium',
                 'title': 'Slow Connection Establishment',
-                'description': f'Found {len(connection_issues)} requests with slow connection establishment (>2s)',
+                'description': f'Found {scan.connect_count} requests with slow connection establishment (>2s)',
                 'details': {
-                    'slow_connections': connection_issues[:5]  # Show first 5
+                    'slow_connections': [
+                        {'url': scan.url(i, ''), 'connect_time': t}
+                        for i, t in zip(scan.connect_idx, scan.connect_times)
+                    ]
                 }
             })
-    
-    def _generate_statistics(self, entries: List[Dict[str, Any]]):
-        """Generate overall statistics"""
-        total_requests = len(entries)
-        response_times = [entry.get('time', 0) for entry in entries]
-        status_codes = [entry.get('response', {}).get('status', 0) for entry in entries]
-        
-        self.stats = {
-            'total_requests': total_requests,
-            'average_response_time': round(statistics.mean(response_times), 2) if response_times else 0,
-            'max_response_time': max(response_times) if response_times else 0,
-            'min_response_time': min(response_times) if response_times else 0,
-            'successful_requests': len([s for s in status_codes if 200 <= s < 300]),
-            'error_requests': len([s for s in status_codes if s >= 400]),
-            'unique_domains': len(set(urlparse(entry.get('request', {}).get('url', '')).netloc for entry in entries))
-        }
+
+def _stream_har_file(file_path: str) -> Dict[str, Any]:
+    """Parse the HAR up to log.entries; the entries themselves are streamed"""
+    f = open(file_path, 'rb', buffering=IO_BUFFER_SIZE)
+    try:
+        events = ijson.parse(f, use_float=True)
+        has_log = False
+        for prefix, event, value in events:
+            if prefix == 'log.entries' and event == 'start_array':
+                return {'log': {'entries': _iter_entries(f, events)}}
+            if prefix == 'log' and event == 'start_map':
+                has_log = True
+    except BaseException:
+        f.close()
+        raise
+    f.close()
+    return {'log': {}} if has_log else {}
+
+def _iter_entries(f, events) -> Iterable[Dict[str, Any]]:
+    """Yield HAR entries one at a time from an ijson event stream.
+
+    Invalid JSON further down the file raises ijson.JSONError from the scan
+    that consumes the entries; main() reports it like a load error.
+    """
+    with f:
+        yield from ijson.items(events, 'log.entries.item')
 
 def load_har_file(file_path: str) -> Dict[str, Any]:
     """Load and parse HAR file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        if ijson is not None:
+            return _stream_har_file(file_path)
+        with open(file_path, 'rb', buffering=IO_BUFFER_SIZE) as f:
+            if orjson is not None:
+                return orjson.loads(f.read())
             return json.load(f)
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in HAR file: {e}")
+    except JSON_ERRORS:
+        # Parser messages differ between backends; the report should not
+        print("Error: Invalid JSON in HAR file")
         sys.exit(1)
     except Exception as e:
         print(f"Error reading HAR file: {e}")
         sys.exit(1)
 
+@lru_cache(maxsize=None)
+def _title(key: str) -> str:
+    """Display form of an issue type or details key"""
+    return key.title()
+
 def print_issues(issues: List[Dict[str, Any]], stats: Dict[str, Any]):
     """Print analysis results in a formatted way"""
-    print("=" * 80)
-    print("HAR FILE ANALYSIS REPORT")
-    print("=" * 80)
-    print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print()
+    # Collect the report and write it in one go instead of one print per line;
+    # whatever was formatted is still written if formatting fails part-way.
+    lines = []
+    out = lines.append
+    try:
+        _format_issues(issues, stats, out)
+    finally:
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+
+def _format_issues(issues: List[Dict[str, Any]], stats: Dict[str, Any], out):
+    out("=" * 80)
+    out("HAR FILE ANALYSIS REPORT")
+    out("=" * 80)
+    out(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    out("")
     
     # Print statistics
-    print("📊 OVERALL STATISTICS")
-    print("-" * 40)
-    print(f"Total Requests: {stats['total_requests']}")
-    print(f"Successful Requests (2xx): {stats['successful_requests']}")
-    print(f"Error Requests (4xx/5xx): {stats['error_requests']}")
-    print(f"Average Response Time: {stats['average_response_time']}ms")
-    print(f"Max Response Time: {stats['max_response_time']}ms")
-    print(f"Unique Domains: {stats['unique_domains']}")
-    print()
+    out("📊 OVERALL STATISTICS")
+    out("-" * 40)
+    out(f"Total Requests: {stats['total_requests']}")
+    out(f"Successful Requests (2xx): {stats['successful_requests']}")
+    out(f"Error Requests (4xx/5xx): {stats['error_requests']}")
+    out(f"Average Response Time: {stats['average_response_time']}ms")
+    out(f"Max Response Time: {stats['max_response_time']}ms")
+    out(f"Unique Domains: {stats['unique_domains']}")
+    out("")
     
     if not issues:
-        print("✅ No issues detected!")
+        out("✅ No issues detected!")
         return
     
     # Group issues by severity
@@ -378,32 +700,63 @@ def print_issues(issues: List[Dict[str, Any]], stats: Dict[str, Any]):
     for severity in severity_order:
         severity_issues = [issue for issue in issues if issue['severity'] == severity]
         if severity_issues:
-            print(f"{severity_colors[severity]} {severity.upper()} SEVERITY ISSUES")
-            print("-" * 40)
+            out(f"{severity_colors[severity]} {severity.upper()} SEVERITY ISSUES")
+            out("-" * 40)
             
             for i, issue in enumerate(severity_issues, 1):
-                print(f"{i}. {issue['title']}")
-                print(f"   Type: {issue['type'].title()}")
-                print(f"   Description: {issue['description']}")
+                out(f"{i}. {issue['title']}")
+                out(f"   Type: {_title(issue['type'])}")
+                out(f"   Description: {issue['description']}")
                 
-                if 'details' in issue and issue['details']:
-                    if isinstance(issue['details'], dict):
-                        for key, value in issue['details'].items():
-                            if isinstance(value, list) and len(value) > 0:
-                                print(f"   {key.title()}: {len(value)} items")
+                details = issue.get('details')
+                if details:
+                    if type(details) is dict:
+                        for key, value in details.items():
+                            if type(value) is list and value:
+                                out(f"   {_title(key)}: {len(value)} items")
                                 for item in value[:3]:  # Show first 3 items
-                                    if isinstance(item, dict):
+                                    if type(item) is dict:
                                         if 'url' in item:
-                                            print(f"     - {item['url']}")
+                                            out(f"     - {item['url']}")
                                         elif 'description' in item:
-                                            print(f"     - {item['description']}")
+                                            out(f"     - {item['description']}")
                                     else:
-                                        print(f"     - {item}")
+                                        out(f"     - {item}")
                             else:
-                                print(f"   {key.title()}: {value}")
+                                out(f"   {_title(key)}: {value}")
                     else:
-                        print(f"   Details: {issue['details']}")
-                print()
+                        out(f"   Details: {details}")
+                out("")
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj as 2-space indented UTF-8 JSON.
+
+    Always json.dumps, even with orjson installed: orjson writes floats
+    differently (1e17 instead of 1e+17), and the results file should not
+    depend on which backends are present.
+    """
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+def save_results(file_path: str, output_data: Dict[str, Any]):
+    """Write the JSON report one top-level field and one issue at a time.
+
+    The result is laid out exactly like json.dump(output_data, indent=2), but
+    the whole report is never held in memory as a single string.
+    """
+    with open(file_path, 'wb', buffering=IO_BUFFER_SIZE) as f:
+        f.write(b'{')
+        for n, (key, value) in enumerate(output_data.items()):
+            f.write(b',\n  ' if n else b'\n  ')
+            f.write(_dumps(key) + b': ')
+            if key == 'issues' and value:
+                f.write(b'[')
+                for i, issue in enumerate(value):
+                    f.write(b',\n    ' if i else b'\n    ')
+                    f.write(_dumps(issue).replace(b'\n', b'\n    '))
+                f.write(b'\n  ]')
+            else:
+                f.write(_dumps(value).replace(b'\n', b'\n  '))
+        f.write(b'\n}' if output_data else b'}')
 
 def main():
     parser = argparse.ArgumentParser(
@@ -420,6 +773,8 @@ Examples:
     parser.add_argument('har_file', help='Path to the HAR file to analyze')
     parser.add_argument('-o', '--output', help='Output results to JSON file')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes for scanning entries (default: 1); helps on very large HAR files')
     
     args = parser.parse_args()
     
@@ -427,8 +782,18 @@ Examples:
     har_data = load_har_file(args.har_file)
     
     # Analyze
-    analyzer = HARAnalyzer(har_data)
-    issues = analyzer.analyze()
+    # Verbose runs keep every matching request as an example, not just the first few
+    analyzer = HARAnalyzer(har_data, detail_limit=None if args.verbose else DETAIL_LIMIT,
+                           jobs=args.jobs)
+    try:
+        issues = analyzer.analyze()
+    except HARFormatError as e:
+        print(f"Error: Invalid HAR file: {e}")
+        sys.exit(1)
+    except JSON_ERRORS:
+        # Streamed entries are parsed during the analysis
+        print("Error: Invalid JSON in HAR file")
+        sys.exit(1)
     
     # Print results
     print_issues(issues, analyzer.stats)
@@ -443,8 +808,7 @@ Examples:
         }
         
         try:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            save_results(args.output, output_data)
             print(f"📄 Results saved to: {args.output}")
         except Exception as e:
             print(f"Error saving results: {e}")
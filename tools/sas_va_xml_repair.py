@@ -10,23 +10,307 @@ Author: SAS VA Expert
 Date: 2024
 """
 
-import xml.etree.ElementTree as ET
+try:
+    from lxml import etree as ET
+    HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAVE_LXML = False
 import re
 import os
 import sys
 import argparse
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Callable, Dict, Iterator, List, Tuple, Optional, Set
 from dataclasses import dataclass
-from pathlib import Path
+from enum import IntEnum
 import logging
 import json
 import base64
+import heapq
 import zlib
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache, wraps
+from itertools import chain, islice
+
+try:
+    import ahocorasick
+except ImportError:  # optional: multi-substring prefilter
+    ahocorasick = None
+
+# orjson parses UTF-8 bytes directly; stdlib json.loads accepts bytes as well
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+READ_BUFFER_SIZE = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Compressed transfer content is inflated in bounded output chunks
+ZLIB_CHUNK_SIZE = 1 << 20
+
+# Longest string whose prefilter answer is memoized
+MEMO_MAX_LENGTH = 256
+
+# Entries listed per section of the printed analysis; the rest are summarized
+MAX_LISTED_ITEMS = 200
+
+# Skeleton used by the corrupted-report repair (namespace when the report has none)
+MINIMAL_REPORT_NS = "http://www.sas.com/sasreportmodel/bird-3.2.2"
+MINIMAL_REPORT_SECTIONS = (
+    'DataSources', 'DataDefinitions', 'VisualElements', 'Views', 'PromptDefinitions',
+    'Actions', 'Conditions', 'Interactions', 'MediaSchemes', 'DataSourceMappings',
+    'Groupings', 'CustomSorts',
+)
+
+# Precompiled patterns used on every element / every save
+_NS_URI = re.compile(r'\{(.+?)\}')
+_ID_CHECK = re.compile(r'[a-z]{2}[0-9]+')
+_ID_IN_TEXT = re.compile(r'(?<![A-Za-z0-9#])[a-z]{2}[0-9]+')
+_HTML_COLOR = re.compile(r'^[a-fA-F0-9]{6}$')
+_NS_PREFIX = re.compile(r'ns\d+:')
+_TEXT_BETWEEN = re.compile(r'>([^<]*?)<')
+_COMMA_RUN = re.compile(r',(?:\s*,)+')
+_EMPTY_PARENS = re.compile(r'\(\s*\)')
+
+# Declaration ElementTree writes (single quotes); swapped for XML_DECLARATION on save
+_ET_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>"
+
+# Attributes whose value is a plain reference to another object's name
+_REF_ATTRS = ('ref', 'data', 'source', 'target', 'value')
+
+# Duplicate names that are legitimate in SAS BIRD XML (dynamic variables, CSS properties)
+_LEGIT_DUP_NAMES = frozenset({
+    'CATEGORY', 'RESPONSE', 'GROUP', 'COLUMN', 'ROW', 'TIP',
+    'KEY_FRAME', 'HIDDEN', 'X', 'Y'
+})
+
+# Element types whose duplicate names are legitimate when all duplicates share the type
+_LEGIT_DUP_TYPES = frozenset({'DynVar', 'Category', 'Property', 'KeyValue', 'HistogramParm'})
+
+# Characters kept after each "pr" in text when streaming, to match prompt ids against
+_PROMPT_ID_WINDOW = 64
+
+# Object types listed (in this order) under "Object Counts by Type"
+COUNTED_TYPES = (
+    'ParentDataDefinition',
+    'DataDefinition',
+    'DataSource',
+    'DataItem',
+    'PredefinedDataItem',
+    'VisualElements',
+    'Image',
+    'VisualContainer',
+    'Prompt',
+    'MediaContainer',
+    'Section',
+    'Container',
+    'Actions',
+    'NavigationAction',
+)
+_COUNTED_TYPE_SET = frozenset(COUNTED_TYPES)
+
+# Section names counted together with the object type they contain
+_COUNT_ALIASES = {'DataDefinitions': 'DataDefinition', 'DataSources': 'DataSource'}
+
+# Referenced IDs that are never real null candidates ('bi1' is a special case to ignore)
+_FALSE_POSITIVE_LITERALS = frozenset({'label', 'title', 'name', 'id', 'bi1'})
+
+# Expression values that leave an element with nothing to evaluate
+EMPTY_EXPR_SET = frozenset({'', '()', '${}'})
+
+@lru_cache(maxsize=8)
+def _null_candidate_regex(null_candidates: frozenset) -> "re.Pattern":
+    """
+    Single alternation matching ${candidate[,...]} or a standalone candidate
+    reference for any of the given null candidates
+    """
+    alt = "|".join(re.escape(c) for c in sorted(null_candidates, key=lambda c: (-len(c), c)))
+    return re.compile(rf'\$\{{(?:{alt})(?:,[^}}]*)?\}}|(?<![A-Za-z0-9#])(?:{alt})(?![A-Za-z0-9])')
+
+@lru_cache(maxsize=8)
+def _contains_any(needles: frozenset) -> Callable[[str], bool]:
+    """
+    Build a predicate telling whether a string contains any of the needles,
+    in a single pass over the string (Aho-Corasick if available, otherwise
+    one compiled alternation). Most attribute values repeat across a report
+    ("true", formats, labels), so answers for short values are memoized and
+    a repeated value costs one dict lookup instead of a scan. Predicates are
+    cached per needle set so every caller shares the same memo.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for needle in needles:
+            automaton.add_word(needle, needle)
+        automaton.make_automaton()
+        scan = lambda value: next(automaton.iter(value), None) is not None
+    else:
+        search = re.compile("|".join(re.escape(n) for n in needles)).search
+        scan = lambda value: search(value) is not None
+    
+    seen: Dict[str, bool] = {}
+    
+    def contains(value: str) -> bool:
+        found = seen.get(value)
+        if found is None:
+            found = scan(value)
+            if len(value) <= MEMO_MAX_LENGTH:
+                seen[value] = found
+        return found
+    return contains
+
+def _filter_null_candidates(referenced: Set[str], defined: Set[str]) -> Set[str]:
+    """
+    Null candidates are referenced but not defined, minus known false
+    positives (labels, 'bi1') and anything that looks like an HTML color
+    """
+    return {
+        candidate for candidate in referenced - defined - _FALSE_POSITIVE_LITERALS
+        if not _HTML_COLOR.match(candidate)
+    }
+
+def _text_fixup(match) -> str:
+    """Rewrite one >text< run of serialized XML the way SAS VA writes it"""
+    text = match.group(1)
+    return '>' + text.replace("'", "&apos;").replace('&lt;', '<').replace('&gt;', '>') + '<'
+
+class _TextFixupWriter:
+    """
+    File wrapper applying the _text_fixup rewrite to serialized UTF-8 XML as it
+    streams through, so the document never has to exist as one string.
+    Text runs are the bytes between a '>' and the next '<'; the markup bytes
+    involved are ASCII and never occur inside a multi-byte UTF-8 sequence.
+    """
+    
+    def __init__(self, raw):
+        self._raw = raw
+        self._in_text = False
+        self._pending = b''  # possibly incomplete entity held back from the last chunk
+    
+    @staticmethod
+    def _fix(text: bytes) -> bytes:
+        return text.replace(b"'", b"&apos;").replace(b'&lt;', b'<').replace(b'&gt;', b'>')
+    
+    def write(self, data: bytes) -> int:
+        size = len(data)
+        data = self._pending + data
+        self._pending = b''
+        pos = 0
+        out = []
+        while pos < len(data):
+            if self._in_text:
+                end = data.find(b'<', pos)
+                if end == -1:
+                    text = data[pos:]
+                    amp = text.rfind(b'&')
+                    if amp != -1 and len(text) - amp < 4:
+                        self._pending = text[amp:]
+                        text = text[:amp]
+                    out.append(self._fix(text))
+                    break
+                out.append(self._fix(data[pos:end]))
+                out.append(b'<')
+                self._in_text = False
+                pos = end + 1
+            else:
+                end = data.find(b'>', pos)
+                if end == -1:
+                    out.append(data[pos:])
+                    break
+                out.append(data[pos:end + 1])
+                self._in_text = True
+                pos = end + 1
+        self._raw.write(b''.join(out))
+        return size
+    
+    def flush(self):
+        if self._pending:
+            self._raw.write(self._pending)
+            self._pending = b''
+        self._raw.flush()
+
+def _make_parser(recover: bool = False):
+    """
+    Parser for BIRD XML. With lxml, comments and processing instructions are
+    dropped so the tree matches what ElementTree builds; with recover, lxml
+    also builds what it can from a malformed document (errors are left in
+    the parser's error_log) instead of raising.
+    """
+    if HAVE_LXML:
+        return ET.XMLParser(huge_tree=True, remove_blank_text=False, recover=recover,
+                            remove_comments=True, remove_pis=True, collect_ids=False)
+    return None
+
+def _recovered_errors(error_log) -> List[str]:
+    """Messages of the errors an lxml parser recovered from"""
+    return [f"line {e.line}: {e.message}" for e in error_log.filter_from_errors()]
+
+@lru_cache(maxsize=None)
+def _localname(tag: str) -> str:
+    """Tag name without its '{namespace}' prefix"""
+    i = tag.find('}')
+    return tag if i < 0 else tag[i + 1:]
+
+def _find_all_substrings(needles) -> Callable[[str], Set[str]]:
+    """
+    Build a function returning every needle that occurs in a string, in a
+    single pass over the string (Aho-Corasick if available, otherwise one
+    lookahead alternation; needles sharing a start position are prefixes of
+    the longest one found there)
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for needle in needles:
+            automaton.add_word(needle, needle)
+        automaton.make_automaton()
+        return lambda value: {found for _, found in automaton.iter(value)}
+    needle_set = frozenset(needles)
+    lengths = sorted({len(n) for n in needle_set})
+    alt = "|".join(re.escape(n) for n in sorted(needle_set, key=lambda n: (-len(n), n)))
+    finditer = re.compile(f"(?=({alt}))").finditer
+    
+    def find(value: str) -> Set[str]:
+        found = set()
+        for match in finditer(value):
+            longest = match.group(1)
+            found.update(longest[:k] for k in lengths if longest[:k] in needle_set)
+        return found
+    return find
+
+def _cached_analysis(method):
+    """
+    Memoize an analysis method's result on the instance until the tree is
+    next modified (see BIRDXMLRepair._invalidate_xml_content)
+    """
+    @wraps(method)
+    def wrapper(self):
+        cache = self._analysis_cache
+        if method.__name__ not in cache:
+            cache[method.__name__] = method(self)
+        return cache[method.__name__]
+    return wrapper
+
+def _print_unlisted(total: int):
+    """Footer for an analysis list cut off at MAX_LISTED_ITEMS entries"""
+    if total > MAX_LISTED_ITEMS:
+        print(f"  ... and {total - MAX_LISTED_ITEMS} more")
+
+class IssueCategory(IntEnum):
+    """Kind of a potential issue; analyses list issues as (category, message)"""
+    NO_ROOT = 1
+    DUPLICATE_OBJECTS = 2
+    NULL_CANDIDATES = 3
+    UNUSED_PROMPTS = 4
+    CORRUPTED = 5
+    RECOVERED_ERRORS = 6
+
 @dataclass
 class ObjectReference:
     """Represents an object reference in the BIRD XML"""
@@ -42,8 +326,14 @@ class BIRDXMLRepair:
     
     def __init__(self, xml_file_path: str):
         self.xml_file_path = xml_file_path
-        self.xml_content = ""
+        self._xml_data = None
+        self.recovered_errors: List[str] = []
+        self._xml_content = None
+        self._tree_modified = False
         self.root = None
+        self._by_name = None
+        self._ref_index = None
+        self._analysis_cache = {}
         self.next_unique_name_index = 0
         self.object_mappings = {}
         self.duplicate_objects = {}
@@ -66,20 +356,119 @@ class BIRDXMLRepair:
             'CustomSorts',
             'Groupings'
         ]
-        
+    
+    @classmethod
+    def from_bytes(cls, data: bytes, xml_file_path: str) -> "BIRDXMLRepair":
+        """
+        Repair tool for an XML document already in memory. xml_file_path names
+        the report (and derives the default output path); it need not exist
+        """
+        repair_tool = cls(xml_file_path)
+        repair_tool._xml_data = data
+        return repair_tool
+    
+    @property
+    def xml_content(self) -> str:
+        """
+        The document as text, produced on first use and cached: the file as
+        read while the tree is unmodified, the serialized tree afterwards
+        """
+        if self._xml_content is None:
+            if self.root is None:
+                return ""
+            if self._tree_modified:
+                self._xml_content = ET.tostring(self.root, encoding='unicode')
+            elif self._xml_data is not None:
+                self._xml_content = self._xml_data.decode('utf-8')
+            else:
+                with open(self.xml_file_path, 'r', encoding='utf-8') as f:
+                    self._xml_content = f.read()
+        return self._xml_content
+    
+    @xml_content.setter
+    def xml_content(self, value: str):
+        self._xml_content = value
+        self._tree_modified = True
+    
+    @property
+    def modified(self) -> bool:
+        """Whether a repair has changed the tree since it was loaded"""
+        return self._tree_modified
+    
+    def _invalidate_xml_content(self):
+        """
+        Mark the tree as changed so xml_content is re-serialized and the
+        analysis re-run on next use
+        """
+        self._xml_content = None
+        self._tree_modified = True
+        self._analysis_cache = {}
+    
+    def _build_indexes(self):
+        """Index elements by name and by the value of their reference attributes, in one pass"""
+        by_name: Dict[str, List] = {}
+        ref_index: Dict[str, List[Tuple[object, str]]] = {}
+        for elem in self.root.iter():
+            get = elem.get
+            name = get('name')
+            if name is not None:
+                by_name.setdefault(name, []).append(elem)
+            for attr in _REF_ATTRS:
+                value = get(attr)
+                if value is not None:
+                    ref_index.setdefault(value, []).append((elem, attr))
+        self._by_name = by_name
+        self._ref_index = ref_index
+    
+    def _ensure_indexes(self):
+        if self._by_name is None:
+            self._build_indexes()
+    
+    def _invalidate_indexes(self):
+        """Drop the name/reference indexes after edits that do not maintain them"""
+        self._by_name = None
+        self._ref_index = None
+    
+    def _parent_lookup(self) -> Callable:
+        """elem -> parent function: lxml elements know their parent, ElementTree needs a map"""
+        if HAVE_LXML:
+            return lambda elem: elem.getparent()
+        return {child: parent for parent in self.root.iter() for child in parent}.get
+    
+    def _rename_element(self, elem, new_id: str):
+        """Set an element's name attribute, keeping the name index in step"""
+        old_id = elem.attrib['name']
+        elem.attrib['name'] = new_id
+        self._by_name[old_id].remove(elem)
+        self._by_name.setdefault(new_id, []).append(elem)
+    
     def load_xml(self) -> bool:
-        """Load and parse the XML file"""
+        """Load and parse the XML file (or the in-memory document given to from_bytes)"""
         try:
-            with open(self.xml_file_path, 'r', encoding='utf-8') as f:
-                self.xml_content = f.read()
+            # lxml recovers what it can from a malformed report; ElementTree raises
+            parser = _make_parser(recover=True)
+            if self._xml_data is not None:
+                self.root = ET.fromstring(self._xml_data, parser)
+            else:
+                with open(self.xml_file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+                    self.root = ET.parse(f, parser).getroot()
+            if self.root is None:
+                logger.error("Failed to load XML file: no root element could be recovered")
+                return False
+            self.recovered_errors = _recovered_errors(parser.error_log) if parser is not None else []
+            if self.recovered_errors:
+                logger.warning(f"Recovered from {len(self.recovered_errors)} XML errors, "
+                               f"first at {self.recovered_errors[0]}")
+            self._xml_content = None
+            self._tree_modified = False
+            self._analysis_cache = {}
+            self._invalidate_indexes()
             
-            # Extract nextUniqueNameIndex from first line
-            first_line = self.xml_content.split('\n')[0]
-            match = re.search(r'nextUniqueNameIndex="(\d+)"', first_line)
-            if match:
-                self.next_unique_name_index = int(match.group(1))
+            # Extract nextUniqueNameIndex from the root element
+            next_index = self.root.get('nextUniqueNameIndex')
+            if next_index and next_index.isdigit():
+                self.next_unique_name_index = int(next_index)
             
-            self.root = ET.fromstring(self.xml_content)
             logger.info(f"Successfully loaded XML file: {self.xml_file_path}")
             return True
             
@@ -88,55 +477,75 @@ class BIRDXMLRepair:
             return False
     
     def save_xml(self, output_path: Optional[str] = None) -> bool:
-        """Save the repaired XML to file, preserving the default namespace (no ns0 prefix)"""
+        """
+        Save the repaired XML to file, preserving the default namespace (no ns0 prefix).
+        Without an explicit output_path nothing is written unless a repair changed the tree
+        """
         try:
+            if self.root is None:
+                logger.error("No XML root element to save")
+                return False
+
             if output_path is None:
+                if not self._tree_modified:
+                    logger.info("No repairs changed the report, nothing to save")
+                    return True
                 base_name = os.path.splitext(self.xml_file_path)[0]
                 output_path = f"{base_name}_repaired.xml"
 
-            if self.root is None:
-                logger.error("No XML root element to save")
-                return False
+            if HAVE_LXML:
+                # lxml keeps the default namespace as parsed (xmlns=, no ns0
+                # prefix) and writes self-closing tags without a space, so the
+                # tree is streamed out with the text fix-ups applied per chunk
+                with open(output_path, "wb", buffering=WRITE_BUFFER_SIZE) as fh:
+                    out = _TextFixupWriter(fh)
+                    out.write(XML_DECLARATION.encode("ascii") + b"\n")
+                    with ET.xmlfile(out, encoding="utf-8") as xf:
+                        xf.write(self.root)
+                    out.flush()
+            else:
+                # Register the default namespace to avoid ns0 prefix
+                m = _NS_URI.match(self.root.tag)
+                default_ns = m.group(1) if m else None
+                if default_ns:
+                    ET.register_namespace('', default_ns)
 
-            # Register the default namespace to avoid ns0 prefix
-            m = re.match(r'\{(.+?)\}', self.root.tag)
-            default_ns = m.group(1) if m else None
-            if default_ns:
-                ET.register_namespace('', default_ns)
+                # Write XML with formatting to match the working tool
+                xml_bytes = ET.tostring(self.root, encoding="utf-8", xml_declaration=True)
+                xml_str = xml_bytes.decode("utf-8")
+                
+                # Remove namespace prefixes like ns0:
+                xml_str = _NS_PREFIX.sub("", xml_str)
+                
+                # Replace single quotes in XML declaration with double quotes
+                xml_str = xml_str.replace(_ET_DECLARATION, XML_DECLARATION)
+                
+                # Use default namespace (xmlns=) instead of xmlns:ns0=
+                xml_str = xml_str.replace('xmlns:ns0=', 'xmlns=')
+                
+                # Remove ns0: from element tags if any remain
+                xml_str = xml_str.replace('ns0:', '')
+                
+                # Remove the space that precedes all self-closing tags
+                xml_str = xml_str.replace(' />', '/>')
+                
+                # Use &apos; for apostrophes in text content (but not in attribute values)
+                # and convert &lt; and &gt; in text nodes back to < and >, in one pass
+                xml_str = _TEXT_BETWEEN.sub(_text_fixup, xml_str)
 
-            # Write XML with formatting to match the working tool
-            xml_bytes = ET.tostring(self.root, encoding="utf-8", xml_declaration=True)
-            xml_str = xml_bytes.decode("utf-8")
-            
-            # Remove namespace prefixes like ns0:
-            xml_str = re.sub(r"ns\d+:", "", xml_str)
-            
-            # Replace single quotes in XML declaration with double quotes
-            xml_str = re.sub(r"<\?xml version='1.0' encoding='utf-8'\?>", "<?xml version=\"1.0\" encoding=\"UTF-8\"?>", xml_str)
-            
-            # Use default namespace (xmlns=) instead of xmlns:ns0=
-            xml_str = re.sub(r'xmlns:ns0=','xmlns=', xml_str)
-            
-            # Remove ns0: from element tags if any remain
-            xml_str = xml_str.replace('ns0:', '')
-            
-            # Use &apos; for apostrophes in text content (but not in attribute values)
-            def replace_apos_in_text(match):
-                text = match.group(1)
-                return '>' + text.replace("'", "&apos;") + '<'
-            xml_str = re.sub(r'>([^<]*?)<', replace_apos_in_text, xml_str)
-            
-            # Convert &lt; and &gt; in text nodes back to < and > (but not inside CDATA)
-            def unescape_angle_brackets(match):
-                text = match.group(1)
-                return '>' + text.replace('&lt;', '<').replace('&gt;', '>') + '<'
-            xml_str = re.sub(r'>([^<]*?)<', unescape_angle_brackets, xml_str)
-            
-            # Remove the space that precedes all self-closing tags
-            xml_str = re.sub(r' \/>', '/>', xml_str)
+                with open(output_path, "w", encoding="utf-8", newline="\n",
+                          buffering=WRITE_BUFFER_SIZE) as fh:
+                    fh.write(xml_str)
 
-            with open(output_path, "w", encoding="utf-8", newline="\n") as fh:
-                fh.write(xml_str)
+            if self.recovered_errors:
+                # A recovered tree can keep what lxml let through (e.g. a duplicate
+                # attribute), so the output must parse strictly to count as saved
+                try:
+                    ET.parse(output_path, _make_parser())
+                except ET.ParseError as e:
+                    os.remove(output_path)
+                    logger.error(f"Repaired XML is not well-formed, not saved: {e}")
+                    return False
 
             logger.info(f"Repaired XML saved to: {output_path}")
             return True
@@ -145,6 +554,7 @@ class BIRDXMLRepair:
             logger.error(f"Failed to save XML file: {e}")
             return False
     
+    @_cached_analysis
     def find_null_candidates(self) -> Set[str]:
         """
         Find null candidates - object IDs that are referenced but not defined
@@ -153,53 +563,83 @@ class BIRDXMLRepair:
         if self.root is None:
             return set()
         
-        # Regex patterns for finding object IDs
-        id_check = re.compile(r'[a-z]{2}[0-9]+')
-        id_in_text = re.compile(r'(?<![A-Za-z0-9#])[a-z]{2}[0-9]+')
-        
-        # First pass: collect all defined IDs (name attributes)
-        self.defined_ids = set()
-        for elem in self.root.iter():
-            name = elem.get('name')
-            if name and id_check.match(name):
-                self.defined_ids.add(name)
+        id_check = _ID_CHECK.match
+        id_in_text = _ID_IN_TEXT.findall
+        defined = set()
+        referenced = set()
         
-        # Second pass: collect all referenced IDs
-        self.referenced_ids = set()
+        # Single pass: defined IDs (name attributes) and referenced IDs
+        # (other attribute words and element text)
         for elem in self.root.iter():
-            # Check attributes (except name attributes)
-            for key, value in elem.attrib.items():
-                if key != 'name':
-                    for word in value.split():
-                        if id_check.match(word):
-                            self.referenced_ids.add(word)
+            for key, value in elem.items():
+                if key == 'name':
+                    if value and id_check(value):
+                        defined.add(value)
+                else:
+                    referenced.update(word for word in value.split() if id_check(word))
             
-            # Check element text content
             if elem.text is not None:
-                results = id_in_text.findall(elem.text)
-                for found in results:
-                    self.referenced_ids.add(found)
-        
-        # Null candidates are referenced but not defined
-        self.null_candidates = self.referenced_ids - self.defined_ids
-        
-        # Filter out known false positives (like HTML colors, labels)
-        false_positives = set()
-        for candidate in self.null_candidates:
-            # Skip if it looks like an HTML color code
-            if re.match(r'^[a-fA-F0-9]{6}$', candidate):
-                false_positives.add(candidate)
-            # Skip if it's a common label pattern
-            elif candidate.lower() in ['label', 'title', 'name', 'id']:
-                false_positives.add(candidate)
-            # Skip if it's 'bi1' (special case to ignore)
-            elif candidate == 'bi1':
-                false_positives.add(candidate)
-        
-        self.null_candidates -= false_positives
+                referenced.update(id_in_text(elem.text))
+        
+        self.defined_ids = defined
+        self.referenced_ids = referenced
+        self.null_candidates = _filter_null_candidates(referenced, defined)
         
         return self.null_candidates
     
+    def _element_ids(self, elem) -> Tuple[Optional[str], List[str]]:
+        """The (defined ID, referenced IDs) an element contributes, as in find_null_candidates"""
+        defined = None
+        referenced = []
+        for key, value in elem.items():
+            if key == 'name':
+                if value and _ID_CHECK.match(value):
+                    defined = value
+            else:
+                referenced.extend(word for word in value.split() if _ID_CHECK.match(word))
+        if elem.text is not None:
+            referenced.extend(_ID_IN_TEXT.findall(elem.text))
+        return defined, referenced
+    
+    def _index_null_candidates(self) -> Set[str]:
+        """
+        Same result as find_null_candidates, but also remember each element's
+        contribution so later edits can be applied with _reindex_null_candidates
+        """
+        self._element_id_index = {}
+        self._defined_counts = Counter()
+        self._referenced_counts = Counter()
+        for elem in self.root.iter():
+            defined, referenced = self._element_ids(elem)
+            if defined is not None or referenced:
+                self._element_id_index[elem] = (defined, referenced)
+                if defined is not None:
+                    self._defined_counts[defined] += 1
+                self._referenced_counts.update(referenced)
+        return self._null_candidates_from_index()
+    
+    def _reindex_null_candidates(self, dirty) -> Set[str]:
+        """Re-scan only the elements modified since the last (re)index"""
+        for elem in dirty:
+            old_defined, old_referenced = self._element_id_index.pop(elem, (None, ()))
+            if old_defined is not None:
+                self._defined_counts[old_defined] -= 1
+            self._referenced_counts.subtract(old_referenced)
+            
+            defined, referenced = self._element_ids(elem)
+            if defined is not None or referenced:
+                self._element_id_index[elem] = (defined, referenced)
+                if defined is not None:
+                    self._defined_counts[defined] += 1
+                self._referenced_counts.update(referenced)
+        return self._null_candidates_from_index()
+    
+    def _null_candidates_from_index(self) -> Set[str]:
+        self.defined_ids = {i for i, count in self._defined_counts.items() if count > 0}
+        self.referenced_ids = {i for i, count in self._referenced_counts.items() if count > 0}
+        self.null_candidates = _filter_null_candidates(self.referenced_ids, self.defined_ids)
+        return self.null_candidates
+    
     def repair_null_candidates(self) -> bool:
         """
         Comprehensive repair of null candidates by removing ALL references to them
@@ -217,11 +657,12 @@ class BIRDXMLRepair:
         
         # Phase 1: Clean up expressions and attributes that contain null candidate references
         # (More conservative approach - don't remove entire elements, just clean content)
+        has_candidate = _contains_any(frozenset(self.null_candidates))
         for elem in self.root.iter():
             # Clean all attributes (except name attributes)
             attrs_to_update = {}
-            for key, value in elem.attrib.items():
-                if key != 'name' and value and any(nc in value for nc in self.null_candidates):
+            for key, value in elem.items():
+                if key != 'name' and value and has_candidate(value):
                     cleaned_value = self._remove_null_candidate_references(value)
                     if cleaned_value != value:
                         attrs_to_update[key] = cleaned_value
@@ -232,43 +673,47 @@ class BIRDXMLRepair:
                 elem.attrib[key] = value
             
             # Clean text content (don't remove the element, just clean the text)
-            if elem.text is not None and any(nc in elem.text for nc in self.null_candidates):
+            if elem.text is not None and has_candidate(elem.text):
                 cleaned_text = self._remove_null_candidate_references(elem.text)
                 if cleaned_text != elem.text:
-                    elem.text = cleaned_text
+                    # None rather than '' so lxml still writes <tag/> like ElementTree
+                    elem.text = cleaned_text or None
                     logger.info(f"Cleaned text content in {elem.tag}: {cleaned_text[:50]}...")
             
             # Clean tail content
-            if elem.tail is not None and any(nc in elem.tail for nc in self.null_candidates):
+            if elem.tail is not None and has_candidate(elem.tail):
                 cleaned_tail = self._remove_null_candidate_references(elem.tail)
                 if cleaned_tail != elem.tail:
                     elem.tail = cleaned_tail
                     logger.info(f"Cleaned tail content in {elem.tag}")
         
         # Phase 2: Remove empty or invalid expressions
-        for elem in self.root.iter():
-            # Remove elements with empty expressions
-            if elem.attrib.get('expression') in ['', '()', '${}']:
-                # For ElementTree, we need to find the parent manually
-                parent = None
-                for potential_parent in self.root.iter():
-                    if elem in list(potential_parent):
-                        parent = potential_parent
-                        break
-                
-                if parent is not None:
-                    parent.remove(elem)
-                    logger.info(f"Removed element {elem.tag} with empty expression")
-        
-        # Update the XML content to reflect changes
-        self.xml_content = ET.tostring(self.root, encoding='unicode')
+        parent_of = self._parent_lookup()
+        empty_elems = [elem for elem in self.root.iter()
+                       if elem.get('expression') in EMPTY_EXPR_SET]
+        removed = set()
+        for elem in empty_elems:
+            # Skip elements already detached along with a removed ancestor
+            parent = parent_of(elem)
+            ancestor = parent
+            while ancestor is not None and ancestor not in removed:
+                ancestor = parent_of(ancestor)
+            if parent is not None and ancestor is None:
+                parent.remove(elem)
+                removed.add(elem)
+                logger.info(f"Removed element {elem.tag} with empty expression")
+        
+        # The tree changed: xml_content is re-serialized lazily if anything reads it
+        self._invalidate_xml_content()
+        self._invalidate_indexes()
         
         # Phase 3: Iterative cleanup until no more null candidates
+        # Index the IDs once; each iteration then only re-scans what it changed
         max_iterations = 5
         iteration = 0
+        remaining_candidates = self._index_null_candidates()
         
         while iteration < max_iterations:
-            remaining_candidates = self.find_null_candidates()
             if not remaining_candidates:
                 logger.info("All null candidates have been successfully repaired")
                 break
@@ -279,11 +724,13 @@ class BIRDXMLRepair:
             self.null_candidates = remaining_candidates
             
             # Repeat the cleaning process
+            has_candidate = _contains_any(frozenset(self.null_candidates))
+            dirty = []
             for elem in self.root.iter():
                 # Clean all attributes again
                 attrs_to_update = {}
-                for key, value in elem.attrib.items():
-                    if value and any(nc in value for nc in self.null_candidates):
+                for key, value in elem.items():
+                    if value and has_candidate(value):
                         cleaned_value = self._remove_null_candidate_references(value)
                         if cleaned_value != value:
                             attrs_to_update[key] = cleaned_value
@@ -291,20 +738,26 @@ class BIRDXMLRepair:
                 # Apply attribute updates
                 for key, value in attrs_to_update.items():
                     elem.attrib[key] = value
+                modified = bool(attrs_to_update)
                 
                 # Clean text content again
-                if elem.text is not None and any(nc in elem.text for nc in self.null_candidates):
+                if elem.text is not None and has_candidate(elem.text):
                     cleaned_text = self._remove_null_candidate_references(elem.text)
                     if cleaned_text != elem.text:
-                        elem.text = cleaned_text
+                        elem.text = cleaned_text or None
+                        modified = True
+                
+                if modified:
+                    dirty.append(elem)
             
+            remaining_candidates = self._reindex_null_candidates(dirty)
             iteration += 1
         
         if iteration >= max_iterations:
             logger.warning(f"Reached maximum iterations ({max_iterations}). Some null candidates may remain.")
         
         # Final check
-        final_remaining = self.find_null_candidates()
+        final_remaining = remaining_candidates
         if final_remaining:
             logger.warning(f"Final remaining null candidates: {final_remaining}")
         else:
@@ -319,25 +772,30 @@ class BIRDXMLRepair:
         if not text:
             return text
         
-        # Create a copy to work with
-        cleaned_text = text
+        if not self.null_candidates:
+            return text.strip()
         
-        for null_candidate in self.null_candidates:
-            # Remove ${null_candidate} patterns
-            pattern1 = rf'\$\{{{re.escape(null_candidate)}(?:,[^}}]*)?\}}'
-            cleaned_text = re.sub(pattern1, '', cleaned_text)
-            
-            # Remove standalone null_candidate references
-            pattern2 = rf'(?<![A-Za-z0-9#]){re.escape(null_candidate)}(?![A-Za-z0-9])'
-            cleaned_text = re.sub(pattern2, '', cleaned_text)
-            
-            # Clean up any resulting double spaces or commas
-            cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
-            cleaned_text = re.sub(r',\s*,', ',', cleaned_text)
-            cleaned_text = re.sub(r'\(\s*\)', '()', cleaned_text)
+        # Fast path: nothing to remove (a memo hit for values already tested by the caller)
+        candidates = frozenset(self.null_candidates)
+        if not _contains_any(candidates)(text):
+            return text
+        
+        # Remove ${null_candidate} and standalone references in one pass
+        # (recompiled only when the candidate set changes)
+        cleaned_text = _null_candidate_regex(candidates).sub('', text)
+        
+        # Clean up any resulting double spaces or commas. split()/join collapses
+        # whitespace runs and strips the ends in C (same whitespace set as \s);
+        # the comma/paren passes only run when those characters are present
+        cleaned_text = ' '.join(cleaned_text.split())
+        if ',' in cleaned_text:
+            cleaned_text = _COMMA_RUN.sub(',', cleaned_text)
+        if '(' in cleaned_text:
+            cleaned_text = _EMPTY_PARENS.sub('()', cleaned_text)
         
-        return cleaned_text.strip()
+        return cleaned_text
     
+    @_cached_analysis
     def find_duplicate_objects(self) -> Dict[str, List[ObjectReference]]:
         """
         Find problematic duplicate object IDs in the XML
@@ -348,21 +806,22 @@ class BIRDXMLRepair:
         if self.root is None:
             return duplicates
         
-        # Find all name attributes in the XML
+        # Count names first so ObjectReferences are only built for repeated names
+        name_counts = Counter(elem.get('name') for elem in self.root.iter())
+        dup_names = {name for name, count in name_counts.items() if count > 1 and name is not None}
+        if not dup_names:
+            return duplicates
+        
         for elem in self.root.iter():
-            if 'name' in elem.attrib:
-                obj_id = elem.attrib['name']
-                
-                if obj_id not in duplicates:
-                    duplicates[obj_id] = []
-                
+            obj_id = elem.get('name')
+            if obj_id in dup_names:
                 # Determine object type based on element tag (without namespace)
-                obj_type = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
+                obj_type = _localname(elem.tag)
                 # Debug: log the actual element type
                 logger.debug(f"Found element with name='{obj_id}', type='{obj_type}', tag='{elem.tag}'")
                 location = self._get_element_location(elem)
                 
-                duplicates[obj_id].append(ObjectReference(
+                duplicates.setdefault(obj_id, []).append(ObjectReference(
                     object_type=obj_type,
                     object_id=obj_id,
                     location=location,
@@ -372,59 +831,29 @@ class BIRDXMLRepair:
         # Filter to only include problematic duplicates
         problematic_duplicates = {}
         for obj_id, references in duplicates.items():
-            if len(references) > 1:
-                # Debug: log what we're checking
-                logger.debug(f"Checking duplicates for {obj_id}: {[ref.object_type for ref in references]}")
-                
-                # Check if these are legitimate duplicates (like DynVar with same name)
-                # or problematic duplicates (like actual object IDs)
-                
-                # Skip if all references are DynVar elements with the same name
-                # (these are legitimate dynamic variables used in different contexts)
-                if all(ref.object_type == 'DynVar' for ref in references):
-                    logger.debug(f"Skipping legitimate DynVar duplicates for {obj_id}")
-                    continue
-                
-                # Skip common legitimate duplicate names that appear in SAS BIRD XML
-                # These are typically dynamic variables or CSS properties that are supposed to be duplicated
-                legitimate_names = {
-                    'CATEGORY', 'RESPONSE', 'GROUP', 'COLUMN', 'ROW', 'TIP', 
-                    'KEY_FRAME', 'HIDDEN', 'X', 'Y'
-                }
-                if obj_id in legitimate_names:
-                    logger.debug(f"Skipping legitimate duplicate name: {obj_id}")
-                    continue
-                
-                # Skip if all references are Category elements in stylesheet
-                # (these are legitimate CSS category definitions)
-                if all(ref.object_type == 'Category' for ref in references):
-                    logger.debug(f"Skipping legitimate Category duplicates for {obj_id}")
-                    continue
-                
-                # Skip if all references are Property elements with the same key
-                # (these are legitimate property definitions)
-                if all(ref.object_type == 'Property' for ref in references):
-                    logger.debug(f"Skipping legitimate Property duplicates for {obj_id}")
-                    continue
-                
-                # Skip if all references are KeyValue elements with the same name
-                # (these are legitimate key-value components used in different contexts)
-                if all(ref.object_type == 'KeyValue' for ref in references):
-                    logger.debug(f"Skipping legitimate KeyValue duplicates for {obj_id}")
-                    continue
-                
-                # Skip if all references are HistogramParm elements with the same name
-                # (these are legitimate histogram parameter components used in different contexts)
-                if all(ref.object_type == 'HistogramParm' for ref in references):
-                    logger.debug(f"Skipping legitimate HistogramParm duplicates for {obj_id}")
-                    continue
-                
-                # Include other types of duplicates as problematic
-                logger.debug(f"Including problematic duplicates for {obj_id}: {[ref.object_type for ref in references]}")
-                problematic_duplicates[obj_id] = references
+            # Debug: log what we're checking
+            logger.debug(f"Checking duplicates for {obj_id}: {[ref.object_type for ref in references]}")
+            
+            # Skip common legitimate duplicate names that appear in SAS BIRD XML
+            # These are typically dynamic variables or CSS properties that are supposed to be duplicated
+            if obj_id in _LEGIT_DUP_NAMES:
+                logger.debug(f"Skipping legitimate duplicate name: {obj_id}")
+                continue
+            
+            # Skip if all references are elements of one type that legitimately repeats
+            # names (DynVar, stylesheet Category, Property, KeyValue, HistogramParm)
+            types = {ref.object_type for ref in references}
+            if len(types) == 1 and next(iter(types)) in _LEGIT_DUP_TYPES:
+                logger.debug(f"Skipping legitimate {next(iter(types))} duplicates for {obj_id}")
+                continue
+            
+            # Include other types of duplicates as problematic
+            logger.debug(f"Including problematic duplicates for {obj_id}: {[ref.object_type for ref in references]}")
+            problematic_duplicates[obj_id] = references
         
         return problematic_duplicates
     
+    @_cached_analysis
     def find_unused_prompts(self) -> Set[str]:
         """
         Find prompts that are defined but not referenced anywhere in the XML
@@ -434,45 +863,33 @@ class BIRDXMLRepair:
             return set()
         
         # Use the same approach as the working fix_report_xml tool
-        # Collect all elements with name attributes
-        id_used = {}
-        id_referenced = set()
-        
-        # Pass 1: collect all ids used as name attributes
+        # Pass 1: collect all prompt ids used as name attributes
+        prompt_ids = set()
         for elem in self.root.iter():
             name = elem.get("name")
-            if name:
-                if name not in id_used:
-                    id_used[name] = []
-                id_used[name].append(elem)
+            if name and name.startswith("pr"):
+                prompt_ids.add(name)
+        if not prompt_ids:
+            return set()
         
-        # Pass 2: collect all ids referenced outside name attributes
+        # Pass 2: collect all prompt ids referenced outside name attributes;
+        # text and tail are scanned once for every prompt id at the same time
+        id_referenced = set()
+        find_prompts = _find_all_substrings(prompt_ids)
         for elem in self.root.iter():
-            # Check attributes (except name)
-            for attr, val in elem.attrib.items():
-                if attr == "name":
-                    continue
-                # Look for prompt IDs in attribute values
-                if val in id_used and val.startswith("pr"):
+            # Check attributes (except name): a value referencing a prompt is exactly its id
+            for attr, val in elem.items():
+                if attr != "name" and val in prompt_ids:
                     id_referenced.add(val)
             
-            # Check element text
+            # Check element text and tail
             if elem.text:
-                for prompt_id in id_used.keys():
-                    if prompt_id.startswith("pr") and prompt_id in elem.text:
-                        id_referenced.add(prompt_id)
-            
-            # Check element tail
+                id_referenced.update(find_prompts(elem.text))
             if elem.tail:
-                for prompt_id in id_used.keys():
-                    if prompt_id.startswith("pr") and prompt_id in elem.tail:
-                        id_referenced.add(prompt_id)
+                id_referenced.update(find_prompts(elem.tail))
         
         # Find unused prompts (defined but not referenced)
-        unused_prompts = {
-            pid for pid in id_used.keys()
-            if pid.startswith("pr") and pid not in id_referenced
-        }
+        unused_prompts = prompt_ids - id_referenced
         
         return unused_prompts
     
@@ -494,50 +911,53 @@ class BIRDXMLRepair:
         
         removed_count = 0
         
+        # Look the prompts up in the name index and their parents directly
+        # instead of searching the whole tree for each one
+        self._ensure_indexes()
+        parent_of = self._parent_lookup()
+        removed = {}
+        
         # Remove unused prompt definitions
         for prompt_id in unused_prompts:
-            # Find all elements with this prompt ID as name attribute
-            elements_to_remove = []
-            for elem in self.root.iter():
-                if elem.get('name') == prompt_id:
-                    elements_to_remove.append(elem)
-            
-            # Remove the elements (we need to do this separately to avoid modifying the tree while iterating)
-            for elem in elements_to_remove:
-                # Find the parent by searching through all elements
-                parent_found = False
-                for potential_parent in self.root.iter():
-                    if elem in list(potential_parent):
-                        potential_parent.remove(elem)
-                        removed_count += 1
-                        logger.info(f"Removed unused prompt: {prompt_id}")
-                        parent_found = True
-                        break
-                
-                if not parent_found:
+            for elem in self._by_name.get(prompt_id, ()):
+                # An element may already have been detached along with a removed ancestor
+                parent = parent_of(elem)
+                ancestor = parent
+                while ancestor is not None and ancestor not in removed:
+                    ancestor = parent_of(ancestor)
+                if ancestor is not None and removed[ancestor] != prompt_id:
+                    # Went with an earlier prompt: it is no longer in the tree
+                    continue
+                if parent is not None and ancestor is None:
+                    parent.remove(elem)
+                    removed[elem] = prompt_id
+                    removed_count += 1
+                    logger.info(f"Removed unused prompt: {prompt_id}")
+                else:
                     logger.warning(f"Could not find parent for unused prompt: {prompt_id}")
         
-        # Update the XML content to reflect changes
-        self.xml_content = ET.tostring(self.root, encoding='unicode')
+        # The tree changed: xml_content is re-serialized lazily if anything reads it
+        self._invalidate_xml_content()
+        self._invalidate_indexes()
         
         logger.info(f"✅ Removed {removed_count} unused prompts")
         return True
     
     def _get_element_location(self, elem) -> str:
         """Get a human-readable location description for an element"""
-        path = []
-        current = elem
-        while current is not None:
-            if current.tag:
-                path.insert(0, current.tag)
-            current = current.getparent() if hasattr(current, 'getparent') else None
+        if not HAVE_LXML:
+            # ElementTree elements have no parent pointer
+            return elem.tag
+        path = [elem.tag]
+        path.extend(ancestor.tag for ancestor in elem.iterancestors())
+        path.reverse()
         
         return " > ".join(path[:3])  # Limit to first 3 levels
     
     def _get_line_number(self, elem) -> int:
-        """Get approximate line number for an element"""
-        # This is a simplified approach - in practice you might want more sophisticated line tracking
-        return 0
+        """Get the source line number for an element (0 if unknown)"""
+        # lxml records the line each element started on; ElementTree does not
+        return getattr(elem, 'sourceline', None) or 0
     
     def repair_duplicate_names(self) -> bool:
         """
@@ -566,11 +986,12 @@ class BIRDXMLRepair:
                 
                 # Store the original ID for later reference
                 if self.root is not None:
-                    for elem in self.root.iter():
-                        elem_type = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
-                        if elem.attrib.get('name') == ref.object_id and elem_type == ref.object_type:
+                    self._ensure_indexes()
+                    for elem in self._by_name.get(ref.object_id, ()):
+                        elem_type = _localname(elem.tag)
+                        if elem_type == ref.object_type:
                             elem.attrib['_original_id'] = ref.object_id
-                            elem.attrib['name'] = new_id
+                            self._rename_element(elem, new_id)
                             break
                 
                 # Update all references to this object
@@ -578,6 +999,9 @@ class BIRDXMLRepair:
                 
                 logger.info(f"Updated duplicate {ref.object_id} to {new_id}")
         
+        # Names changed: the indexes were kept in step, the rest is redone lazily
+        self._invalidate_xml_content()
+        
         return True
     
     def _update_object_id(self, old_id: str, new_id: str, object_type: str):
@@ -585,11 +1009,12 @@ class BIRDXMLRepair:
         if self.root is None:
             return
             
-        for elem in self.root.iter():
+        self._ensure_indexes()
+        for elem in self._by_name.get(old_id, ()):
             # Compare with local name (without namespace)
-            elem_type = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
-            if elem.attrib.get('name') == old_id and elem_type == object_type:
-                elem.attrib['name'] = new_id
+            elem_type = _localname(elem.tag)
+            if elem_type == object_type:
+                self._rename_element(elem, new_id)
                 break
     
     def _update_object_references(self, old_id: str, new_id: str, object_type: str):
@@ -600,15 +1025,12 @@ class BIRDXMLRepair:
         if self.root is None:
             return
             
-        # Update ref attributes
-        for elem in self.root.iter():
-            if elem.attrib.get('ref') == old_id:
-                elem.attrib['ref'] = new_id
-            
-            # Update other common reference attributes
-            for attr in ['data', 'source', 'target', 'value']:
-                if elem.attrib.get(attr) == old_id:
-                    elem.attrib[attr] = new_id
+        # Update ref and the other common reference attributes
+        self._ensure_indexes()
+        renamed = self._ref_index.setdefault(new_id, [])
+        for elem, attr in self._ref_index.pop(old_id, ()):
+            elem.attrib[attr] = new_id
+            renamed.append((elem, attr))
     
     def repair_corrupted_report(self) -> bool:
         """
@@ -626,81 +1048,81 @@ class BIRDXMLRepair:
         # Method 1: Remove object types one by one until report opens
         logger.info("Attempting repair by removing object types...")
         
-        # Create a minimal working XML structure
-        minimal_xml = self._create_minimal_xml()
+        # Create a minimal working XML structure; sections are spliced in at
+        # the DOM level from the already parsed original tree
+        original_root = self.root
+        minimal_root = self._create_minimal_xml(original_root)
         
         # Try adding object types back one by one
         for obj_type in reversed(self.object_types):
             logger.info(f"Testing with {obj_type}...")
             
             # Extract the object type section from original XML
-            obj_section = self._extract_object_section(obj_type)
-            if obj_section:
-                # Add to minimal XML
-                test_xml = self._add_section_to_xml(minimal_xml, obj_type, obj_section)
-                
-                # Validate the XML
-                if self._validate_xml_section(test_xml, obj_type):
-                    logger.info(f"Successfully added {obj_type}")
-                    minimal_xml = test_xml
-                else:
-                    logger.warning(f"Failed to add {obj_type}, skipping")
+            obj_section = self._extract_object_section(obj_type, original_root)
+            if obj_section is not None:
+                self._add_section_to_xml(minimal_root, obj_type, obj_section)
+                logger.info(f"Successfully added {obj_type}")
         
         # Update the XML content with the repaired version
-        self.xml_content = minimal_xml
-        self.root = ET.fromstring(minimal_xml)
+        self.root = minimal_root
+        self._invalidate_xml_content()
+        self._invalidate_indexes()
         
         return True
     
-    def _create_minimal_xml(self) -> str:
-        """Create a minimal working BIRD XML structure"""
-        return f'''<?xml version="1.0" encoding="UTF-8"?>
-<SASReport xmlns="http://www.sas.com/sasreportmodel/bird-3.2.2" nextUniqueNameIndex="{self.next_unique_name_index}">
-    <DataSources/>
-    <DataDefinitions/>
-    <VisualElements/>
-    <Views/>
-    <PromptDefinitions/>
-    <Actions/>
-    <Conditions/>
-    <Interactions/>
-    <MediaSchemes/>
-    <DataSourceMappings/>
-    <Groupings/>
-    <CustomSorts/>
-</SASReport>'''
-    
-    def _extract_object_section(self, obj_type: str) -> Optional[str]:
-        """Extract a specific object type section from the original XML"""
-        try:
-            # Find the section in the original XML
-            pattern = rf'<{obj_type}[^>]*>.*?</{obj_type}>'
-            match = re.search(pattern, self.xml_content, re.DOTALL)
-            return match.group(0) if match else None
-        except Exception as e:
-            logger.error(f"Failed to extract {obj_type} section: {e}")
-            return None
-    
-    def _add_section_to_xml(self, xml_content: str, obj_type: str, section_content: str) -> str:
-        """Add a section to the XML content"""
-        # Find the closing tag and insert before it
-        closing_tag = f"</{obj_type}>"
-        if closing_tag in xml_content:
-            # Replace the empty section
-            empty_section = f"<{obj_type}/>"
-            return xml_content.replace(empty_section, section_content)
+    def _create_minimal_xml(self, original_root=None):
+        """
+        Create a minimal working BIRD XML structure. Given the original root, it
+        keeps that root's attributes and child layout: object type sections become
+        empty placeholders, every other child (View, Properties, History, ...)
+        is carried over unchanged. Otherwise the standard empty sections are used
+        """
+        m = _NS_URI.match(self.root.tag) if self.root is not None else None
+        ns = m.group(1) if m else MINIMAL_REPORT_NS
+        if HAVE_LXML:
+            root = ET.Element(f"{{{ns}}}SASReport", nsmap={None: ns})
         else:
-            # Insert before the closing Report tag
-            return xml_content.replace("</Report>", f"{section_content}\n</Report>")
+            root = ET.Element(f"{{{ns}}}SASReport")
+        if original_root is not None:
+            for key, value in original_root.items():
+                root.set(key, value)
+        root.set("nextUniqueNameIndex", str(self.next_unique_name_index))
+        if original_root is not None and len(original_root):
+            object_types = set(self.object_types)
+            root.text = original_root.text
+            for child in list(original_root):
+                if _localname(child.tag) in object_types:
+                    ET.SubElement(root, child.tag).tail = child.tail
+                else:
+                    # Moved, not copied: the original tree is discarded after the repair
+                    root.append(child)
+            return root
+        root.text = "\n    "
+        for section in MINIMAL_REPORT_SECTIONS:
+            ET.SubElement(root, f"{{{ns}}}{section}").tail = "\n    "
+        root[-1].tail = "\n"
+        return root
     
-    def _validate_xml_section(self, xml_content: str, section_name: str) -> bool:
-        """Basic validation of XML section"""
-        try:
-            ET.fromstring(xml_content)
-            return True
-        except ET.ParseError:
-            return False
+    def _extract_object_section(self, obj_type: str, root=None):
+        """Find a specific object type section (a direct child of the report root)"""
+        root = self.root if root is None else root
+        if root is None:
+            return None
+        m = _NS_URI.match(root.tag)
+        return root.find(f"{{{m.group(1)}}}{obj_type}" if m else obj_type)
+    
+    def _add_section_to_xml(self, minimal_root, obj_type: str, section):
+        """Replace the empty section placeholder in the minimal tree with the given section"""
+        for index, placeholder in enumerate(minimal_root):
+            if placeholder.tag == section.tag:
+                # Moved, not copied: the original tree is discarded after the repair
+                section.tail = placeholder.tail
+                minimal_root[index] = section
+                return minimal_root
+        minimal_root.append(section)
+        return minimal_root
     
+    @_cached_analysis
     def analyze_xml_structure(self) -> Dict:
         """Analyze the XML structure and provide insights"""
         analysis = {
@@ -713,16 +1135,13 @@ class BIRDXMLRepair:
         }
         
         if self.root is None:
-            analysis['potential_issues'].append("No XML root element found")
+            analysis['potential_issues'].append((IssueCategory.NO_ROOT, "No XML root element found"))
             return analysis
         
-        # Count objects by type
-        for elem in self.root.iter():
-            if 'name' in elem.attrib:
-                analysis['total_objects'] += 1
-                # Get the local name without namespace prefix
-                obj_type = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
-                analysis['object_counts'][obj_type] = analysis['object_counts'].get(obj_type, 0) + 1
+        # Count objects (elements with a name) by local type name, in one C-level Counter pass
+        object_counts = Counter(_localname(elem.tag) for elem in self.root.iter() if elem.get('name') is not None)
+        analysis['object_counts'] = dict(object_counts)
+        analysis['total_objects'] = sum(object_counts.values())
         
         # Find duplicates
         duplicates = self.find_duplicate_objects()
@@ -738,23 +1157,32 @@ class BIRDXMLRepair:
         
         # Identify potential issues
         if duplicates:
-            analysis['potential_issues'].append(f"Found {len(duplicates)} duplicate object IDs")
+            analysis['potential_issues'].append(
+                (IssueCategory.DUPLICATE_OBJECTS, f"Found {len(duplicates)} duplicate object IDs"))
         
         if null_candidates:
-            analysis['potential_issues'].append(f"Found {len(null_candidates)} null candidates")
+            analysis['potential_issues'].append(
+                (IssueCategory.NULL_CANDIDATES, f"Found {len(null_candidates)} null candidates"))
         
         if unused_prompts:
-            analysis['potential_issues'].append(f"Found {len(unused_prompts)} unused prompts")
+            analysis['potential_issues'].append(
+                (IssueCategory.UNUSED_PROMPTS, f"Found {len(unused_prompts)} unused prompts"))
+        
+        # Reported, but not repaired automatically: the recovered tree may be incomplete
+        if self.recovered_errors:
+            analysis['potential_issues'].append(
+                (IssueCategory.RECOVERED_ERRORS, f"Recovered from {len(self.recovered_errors)} XML parse errors"))
         
-        # Check for common corruption patterns
-        if not self._validate_xml_section(self.xml_content, "Report"):
-            analysis['potential_issues'].append("XML structure appears corrupted")
+        # The tree parsed, so the remaining corruption to catch is a wrong root element
+        if _localname(self.root.tag) != "SASReport":
+            analysis['potential_issues'].append((IssueCategory.CORRUPTED, "XML structure appears corrupted"))
         
         return analysis
     
-    def print_analysis(self):
-        """Print a detailed analysis of the XML file"""
-        analysis = self.analyze_xml_structure()
+    def print_analysis(self, analysis: Optional[Dict] = None):
+        """Print a detailed analysis of the XML file (analyzing it first unless given)"""
+        if analysis is None:
+            analysis = self.analyze_xml_structure()
         
         print("\n" + "="*60)
         print("SAS Visual Analytics BIRD XML Analysis")
@@ -762,101 +1190,310 @@ class BIRDXMLRepair:
         print(f"File: {self.xml_file_path}")
         print(f"Total Objects: {analysis['total_objects']}")
         
-        # Define the specific object types to show
-        target_types = [
-            'ParentDataDefinition',
-            'DataDefinition', 
-            'DataSource',
-            'DataItem',
-            'PredefinedDataItem',
-            'VisualElements',
-            'Image',
-            'VisualContainer',
-            'Prompt',
-            'MediaContainer',
-            'Section',
-            'Container',
-            'Actions',
-            'NavigationAction'
-        ]
-        
-        # Create a filtered and summed object counts dictionary
-        filtered_counts = {}
+        # Filtered counts, with the plural section names summed into their object type
+        filtered_counts = Counter()
         for obj_type, count in analysis['object_counts'].items():
-            # Handle DataDefinition/DataDefinitions summing
-            if obj_type in ['DataDefinition', 'DataDefinitions']:
-                if 'DataDefinition' not in filtered_counts:
-                    filtered_counts['DataDefinition'] = 0
-                filtered_counts['DataDefinition'] += count
-            # Handle DataSource/DataSources summing
-            elif obj_type in ['DataSource', 'DataSources']:
-                if 'DataSource' not in filtered_counts:
-                    filtered_counts['DataSource'] = 0
-                filtered_counts['DataSource'] += count
-            # Add other target types
-            elif obj_type in target_types:
-                filtered_counts[obj_type] = count
+            obj_type = _COUNT_ALIASES.get(obj_type, obj_type)
+            if obj_type in _COUNTED_TYPE_SET:
+                filtered_counts[obj_type] += count
         
         print("\nObject Counts by Type:")
-        for obj_type in target_types:
-            if obj_type in filtered_counts:
-                print(f"  {obj_type}: {filtered_counts[obj_type]}")
-            else:
-                print(f"  {obj_type}: 0")
+        for obj_type in COUNTED_TYPES:
+            print(f"  {obj_type}: {filtered_counts[obj_type]}")
         
+        # Long lists are capped at MAX_LISTED_ITEMS entries; only the first
+        # ones in sorted order are selected, without sorting the whole set
         if analysis['duplicate_objects']:
             print(f"\nDuplicate Objects ({len(analysis['duplicate_objects'])}):")
-            for obj_id, count in analysis['duplicate_objects'].items():
+            for obj_id, count in islice(analysis['duplicate_objects'].items(), MAX_LISTED_ITEMS):
                 print(f"  {obj_id}: {count} instances")
+            _print_unlisted(len(analysis['duplicate_objects']))
         
         if analysis['null_candidates']:
             print(f"\nNull Candidates ({len(analysis['null_candidates'])}):")
-            for obj_id in sorted(analysis['null_candidates']):
+            for obj_id in heapq.nsmallest(MAX_LISTED_ITEMS, analysis['null_candidates']):
                 print(f"  {obj_id}: Referenced but not defined")
+            _print_unlisted(len(analysis['null_candidates']))
         
         if analysis['unused_prompts']:
             print(f"\nUnused Prompts ({len(analysis['unused_prompts'])}):")
-            for prompt_id in sorted(analysis['unused_prompts']):
+            for prompt_id in heapq.nsmallest(MAX_LISTED_ITEMS, analysis['unused_prompts']):
                 print(f"  {prompt_id}: Defined but not referenced")
+            _print_unlisted(len(analysis['unused_prompts']))
         
         if analysis['potential_issues']:
             print(f"\nPotential Issues:")
-            for issue in analysis['potential_issues']:
-                print(f"  ⚠️  {issue}")
+            for _, message in analysis['potential_issues']:
+                print(f"  ⚠️  {message}")
         else:
             print("\n✅ No obvious issues detected")
         
         print("="*60)
 
-def extract_reports_from_json(json_file_path: str) -> list:
+def analyze_only(xml_file_path: str) -> Dict:
+    """
+    Same result as BIRDXMLRepair.analyze_xml_structure, computed while streaming
+    the file with iterparse: finished elements are cleared and dropped, so
+    memory stays proportional to the deepest element path, not the file.
+    With lxml a malformed file is read in recover mode, as load_xml does;
+    otherwise the parser's error is raised.
+    """
+    # Type of each name's first element; types are only listed for repeated names
+    first_types: Dict[str, str] = {}
+    repeated_types: Dict[str, List[str]] = {}
+    object_counts: Dict[str, int] = {}
+    total_objects = 0
+    defined_ids = set()
+    referenced_ids = set()
+    prompt_ids = set()
+    prompt_attr_values = set()
+    prompt_windows = set()  # text following each "pr" in text/tail, to match prompt ids against later
+    
+    id_check = _ID_CHECK.match
+    id_in_text = _ID_IN_TEXT.findall
+    
+    def scan_prompt_text(text):
+        pos = text.find("pr")
+        while pos != -1:
+            prompt_windows.add(text[pos:pos + _PROMPT_ID_WINDOW])
+            pos = text.find("pr", pos + 1)
+    
+    if HAVE_LXML:
+        events = ET.iterparse(xml_file_path, events=('start', 'end'), huge_tree=True, recover=True,
+                              remove_comments=True, remove_pis=True, collect_ids=False)
+    else:
+        events = ET.iterparse(xml_file_path, events=('start', 'end'))
+    
+    stack = []
+    for event, elem in events:
+        if event == 'start':
+            # Attributes are complete at start, which keeps document order for duplicates
+            stack.append(elem)
+            name = elem.get('name')
+            if name is not None:
+                total_objects += 1
+                obj_type = _localname(elem.tag)
+                object_counts[obj_type] = object_counts.get(obj_type, 0) + 1
+                if name in first_types:
+                    repeated_types.setdefault(name, [first_types[name]]).append(obj_type)
+                else:
+                    first_types[name] = obj_type
+                if name and id_check(name):
+                    defined_ids.add(name)
+                if name.startswith("pr"):
+                    prompt_ids.add(name)
+            for key, value in elem.items():
+                if key != 'name':
+                    referenced_ids.update(word for word in value.split() if id_check(word))
+                    if value.startswith("pr"):
+                        prompt_attr_values.add(value)
+            continue
+        
+        # end: text is complete, and so are the tails of all children
+        stack.pop()
+        if elem.text:
+            referenced_ids.update(id_in_text(elem.text))
+            scan_prompt_text(elem.text)
+        for child in elem:
+            if child.tail:
+                scan_prompt_text(child.tail)
+        # Free the subtree but keep the tail: the parser may already have read it
+        del elem[:]
+        elem.text = None
+        elem.attrib.clear()
+        if stack:
+            # Earlier siblings are finished (tails included): drop them. The
+            # parser can run ahead of the events, so later siblings may be present
+            parent = stack[-1]
+            index = 0
+            while parent[index] is not elem:
+                sibling = parent[index]
+                if sibling.tail:
+                    scan_prompt_text(sibling.tail)
+                index += 1
+            del parent[:index]
+    recovered_errors = []
+    if HAVE_LXML:
+        if events.root is None:
+            raise ValueError("no root element could be recovered")
+        recovered_errors = _recovered_errors(events.error_log)
+        if recovered_errors:
+            logger.warning(f"Recovered from {len(recovered_errors)} XML errors, "
+                           f"first at {recovered_errors[0]}")
+    logger.info(f"Successfully loaded XML file: {xml_file_path}")
+    
+    duplicate_objects = {}
+    # Walk the first occurrences so duplicates are listed in document order
+    for obj_id in (first_types if repeated_types else ()):
+        types = repeated_types.get(obj_id)
+        if types is None or obj_id in _LEGIT_DUP_NAMES:
+            continue
+        distinct = set(types)
+        if len(distinct) == 1 and next(iter(distinct)) in _LEGIT_DUP_TYPES:
+            continue
+        duplicate_objects[obj_id] = len(types)
+    
+    null_candidates = _filter_null_candidates(referenced_ids, defined_ids)
+    
+    referenced_prompts = prompt_ids & prompt_attr_values
+    lengths = {len(pid) for pid in prompt_ids}
+    long_ids = [pid for pid in prompt_ids if len(pid) > _PROMPT_ID_WINDOW]
+    for window in prompt_windows:
+        referenced_prompts.update(window[:k] for k in lengths if window[:k] in prompt_ids)
+        if len(window) == _PROMPT_ID_WINDOW:
+            # Ids longer than the window are counted as referenced when the window matches
+            referenced_prompts.update(pid for pid in long_ids if pid.startswith(window))
+    unused_prompts = {pid for pid in prompt_ids if pid and pid not in referenced_prompts}
+    
+    potential_issues = []
+    if duplicate_objects:
+        potential_issues.append(
+            (IssueCategory.DUPLICATE_OBJECTS, f"Found {len(duplicate_objects)} duplicate object IDs"))
+    if null_candidates:
+        potential_issues.append(
+            (IssueCategory.NULL_CANDIDATES, f"Found {len(null_candidates)} null candidates"))
+    if unused_prompts:
+        potential_issues.append(
+            (IssueCategory.UNUSED_PROMPTS, f"Found {len(unused_prompts)} unused prompts"))
+    if recovered_errors:
+        potential_issues.append(
+            (IssueCategory.RECOVERED_ERRORS, f"Recovered from {len(recovered_errors)} XML parse errors"))
+    if _localname(events.root.tag) != "SASReport":
+        potential_issues.append((IssueCategory.CORRUPTED, "XML structure appears corrupted"))
+    
+    return {
+        'total_objects': total_objects,
+        'object_counts': object_counts,
+        'duplicate_objects': duplicate_objects,
+        'null_candidates': null_candidates,
+        'unused_prompts': unused_prompts,
+        'potential_issues': potential_issues
+    }
+
+def _inflate(data: bytes) -> bytearray:
+    """zlib.decompress in bounded chunks appended to one growing buffer"""
+    decompressor = zlib.decompressobj()
+    out = bytearray()
+    while data:
+        out += decompressor.decompress(data, ZLIB_CHUNK_SIZE)
+        if decompressor.eof:
+            break
+        data = decompressor.unconsumed_tail
+    out += decompressor.flush()
+    if not decompressor.eof:
+        raise zlib.error("incomplete or truncated compressed report content")
+    return out
+
+def extract_reports_from_json(json_file_path: str) -> Iterator[Tuple[str, bytes]]:
     """
     Extract all report XMLs from a Viya transfer JSON file (as in ReportExtractor.py)
-    Returns a list of (report_name, xml_content) tuples
+    Yields (report_name, xml_bytes) tuples, decoding each report only when it is
+    asked for so just one decompressed report is held at a time
     """
-    with open(json_file_path, encoding="utf-8") as jfile:
-        transport = json.load(jfile)
-    reports = []
+    with open(json_file_path, "rb", buffering=READ_BUFFER_SIZE) as jfile:
+        transport = json_loads(jfile.read())
     for k in transport.get("transferDetails", []):
         if k["transferObject"]["summary"]["type"] == "report":
             rname = k["transferObject"]["summary"]["name"]
-            content = k["transferObject"]["content"]
+            # Encoded once; the prefix is skipped with a memoryview slice
+            # instead of copying the whole base64 body as a str
+            content = k["transferObject"]["content"].encode("ascii")
             compress = False
-            if content.startswith("TRUE###"):
-                real_content = content[7:]
+            if content.startswith(b"TRUE###"):
+                real_content = memoryview(content)[7:]
                 compress = True
-            elif content.startswith("FALSE###"):
-                real_content = content[8:]
+            elif content.startswith(b"FALSE###"):
+                real_content = memoryview(content)[8:]
             else:
                 real_content = content
             byte_decoded = base64.b64decode(real_content)
+            del content, real_content
             if compress:
-                byte_decompressed = zlib.decompress(byte_decoded)
+                byte_decompressed = _inflate(byte_decoded)
             else:
                 byte_decompressed = byte_decoded
-            object_json = json.loads(byte_decompressed.decode("utf8"))
-            xml = object_json["transferableContent"]["content"]
-            reports.append((rname, xml))
-    return reports
+            del byte_decoded
+            # Parsed from the UTF-8 bytes directly, no decoded str copy
+            object_json = json_loads(byte_decompressed)
+            del byte_decompressed
+            yield rname, object_json["transferableContent"]["content"].encode("utf-8")
+
+def repair_report(rname: str, xml_data: bytes, out_dir: str, keep_originals: bool = False):
+    """
+    Auto-repair one report extracted from a transfer JSON, writing the repaired
+    XML (and, with keep_originals, the extracted one) to out_dir
+    """
+    print(f"\n--- Repairing report: {rname} ---")
+    base_path = os.path.join(out_dir, rname)
+    xml_file_path = f"{base_path}.xml"
+    repaired_file = f"{base_path}_repaired.xml"
+    if keep_originals:
+        with open(xml_file_path, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(xml_data)
+    # Parsed from memory rather than read back from the file
+    repair_tool = BIRDXMLRepair.from_bytes(xml_data, xml_file_path)
+    if not repair_tool.load_xml():
+        print(f"Failed to load XML for report {rname}")
+        return
+    repair_tool.print_analysis()
+    # Auto-repair mode
+    issues_found = False
+    if repair_tool.find_null_candidates():
+        issues_found = True
+        print("🔧 Repairing null candidates...")
+        repair_tool.repair_null_candidates()
+    if repair_tool.find_duplicate_objects():
+        issues_found = True
+        print("🔧 Repairing duplicate names...")
+        repair_tool.repair_duplicate_names()
+    if repair_tool.find_unused_prompts():
+        issues_found = True
+        print("🔧 Removing unused prompts...")
+        repair_tool.repair_unused_prompts()
+    if issues_found:
+        if repair_tool.save_xml(repaired_file):
+            print(f"✅ Repaired XML saved to: {repaired_file}")
+        else:
+            print(f"❌ Failed to save repaired XML for report {rname}")
+    else:
+        print("✅ No repairs needed for this report.")
+
+class _RecordingStream:
+    """Text stream recording each write as (stream name, text) for later replay"""
+    
+    def __init__(self, name: str, chunks: list):
+        self._name = name
+        self._chunks = chunks
+    
+    def write(self, text: str) -> int:
+        self._chunks.append((self._name, text))
+        return len(text)
+    
+    def flush(self):
+        pass
+
+def _repair_report_captured(rname: str, xml_data: bytes, out_dir: str, keep_originals: bool) -> list:
+    """
+    repair_report for a worker process: prints and log records are captured,
+    interleaved as written, and returned as (stream name, text) chunks
+    """
+    chunks = []
+    handlers = [h for h in logging.getLogger().handlers if isinstance(h, logging.StreamHandler)]
+    streams = [h.stream for h in handlers]
+    for handler in handlers:
+        handler.stream = _RecordingStream('stderr', chunks)
+    try:
+        with redirect_stdout(_RecordingStream('stdout', chunks)):
+            repair_report(rname, xml_data, out_dir, keep_originals)
+    finally:
+        for handler, stream in zip(handlers, streams):
+            handler.stream = stream
+    return chunks
+
+def _replay_output(chunks: list):
+    """Write a worker's captured (stream name, text) chunks to this process's streams"""
+    for stream, text in chunks:
+        getattr(sys, stream).write(text)
 
 def main():
     """Main function for command-line usage"""
@@ -870,76 +1507,77 @@ def main():
     parser.add_argument('--repair-unused-prompts', action='store_true', help='Remove unused prompts')
     parser.add_argument('--repair-corrupted', action='store_true', help='Repair corrupted report structure')
     parser.add_argument('--output', help='Output file path for repaired XML')
+    parser.add_argument('--keep-originals', action='store_true', help='For JSON input, also write each extracted report XML next to the repaired one')
     args = parser.parse_args()
 
     xml_file = args.xml_file
     if xml_file is None:
-        xml_files = list(Path('.').glob('*.xml'))
-        if not xml_files:
+        # Stop at the first match (same pattern as glob('*.xml')) instead of listing them all
+        with os.scandir('.') as entries:
+            xml_file = next((entry.name for entry in entries
+                             if entry.name.endswith('.xml') and not entry.name.startswith('.')
+                             and entry.is_file()), None)
+        if xml_file is None:
             print("❌ No XML files found in current directory")
             print("Usage: python sas_va_xml_repair.py [xml_file] [options]")
             sys.exit(1)
-        xml_file = str(xml_files[0])
         print(f"📁 Using XML file: {xml_file}")
 
     # --- JSON input support ---
     if xml_file.lower().endswith('.json'):
         reports = extract_reports_from_json(xml_file)
-        if not reports:
+        first = next(reports, None)
+        if first is None:
             print(f"No reports found in {xml_file}")
             sys.exit(1)
         # Get the directory of the input JSON file
         out_dir = os.path.dirname(os.path.abspath(xml_file))
-        for rname, xml in reports:
-            print(f"\n--- Repairing report: {rname} ---")
-            xml_file_path = os.path.join(out_dir, f"{rname}.xml")
-            repaired_file = os.path.join(out_dir, f"{rname}_repaired.xml")
-            with open(xml_file_path, "w", encoding="utf-8") as f:
-                f.write(xml)
-            repair_tool = BIRDXMLRepair(xml_file_path)
-            if not repair_tool.load_xml():
-                print(f"Failed to load XML for report {rname}")
-                continue
-            repair_tool.print_analysis()
-            # Auto-repair mode
-            issues_found = False
-            if repair_tool.find_null_candidates():
-                issues_found = True
-                print("🔧 Repairing null candidates...")
-                repair_tool.repair_null_candidates()
-            if repair_tool.find_duplicate_objects():
-                issues_found = True
-                print("🔧 Repairing duplicate names...")
-                repair_tool.repair_duplicate_names()
-            if repair_tool.find_unused_prompts():
-                issues_found = True
-                print("🔧 Removing unused prompts...")
-                repair_tool.repair_unused_prompts()
-            if issues_found:
-                repair_tool.save_xml(repaired_file)
-                print(f"✅ Repaired XML saved to: {repaired_file}")
-            else:
-                print("✅ No repairs needed for this report.")
+        second = next(reports, None)
+        if second is None:
+            repair_report(*first, out_dir, args.keep_originals)
+        else:
+            # Reports are independent: repair them in worker processes while
+            # the next ones are decoded, with a bounded number in flight, and
+            # replay each one's output in order
+            max_pending = 2 * (os.cpu_count() or 1)
+            pending = deque()
+            with ProcessPoolExecutor() as executor:
+                for rname, xml_data in chain((first, second), reports):
+                    pending.append(executor.submit(_repair_report_captured, rname, xml_data,
+                                                   out_dir, args.keep_originals))
+                    if len(pending) >= max_pending:
+                        _replay_output(pending.popleft().result())
+                while pending:
+                    _replay_output(pending.popleft().result())
         print(f"\nAll reports in {xml_file} have been processed.")
         sys.exit(0)
 
     # --- XML input logic (existing) ---
     repair_tool = BIRDXMLRepair(xml_file)
+    if args.analyze:
+        # Analysis only: stream the file instead of building the whole tree
+        try:
+            analysis = analyze_only(xml_file)
+        except Exception as e:
+            logger.error(f"Failed to load XML file: {e}")
+            print("Failed to load XML file")
+            sys.exit(1)
+        repair_tool.print_analysis(analysis)
+        return
     if not repair_tool.load_xml():
         print("Failed to load XML file")
         sys.exit(1)
     repair_tool.print_analysis()
     perform_repairs = True
-    if args.analyze:
-        perform_repairs = False
-    elif not any([args.repair_duplicates, args.repair_null_candidates, args.repair_corrupted]):
+    if not any([args.repair_duplicates, args.repair_null_candidates, args.repair_corrupted]):
         analysis = repair_tool.analyze_xml_structure()
         if analysis['duplicate_objects'] or analysis['null_candidates'] or analysis['unused_prompts'] or analysis['potential_issues']:
             print("\n🔧 Auto-repair mode: Issues detected, performing repairs...")
             args.repair_duplicates = bool(analysis['duplicate_objects'])
             args.repair_null_candidates = bool(analysis['null_candidates'])
             args.repair_unused_prompts = bool(analysis['unused_prompts'])
-            args.repair_corrupted = any('corrupted' in issue.lower() for issue in analysis['potential_issues'])
+            args.repair_corrupted = any(category is IssueCategory.CORRUPTED
+                                        for category, _ in analysis['potential_issues'])
         else:
             print("\n✅ No issues detected - no repairs needed")
             perform_repairs = False
@@ -957,7 +1595,10 @@ def main():
             print("🔧 Repairing corrupted report structure...")
             repair_tool.repair_corrupted_report()
         if repair_tool.save_xml(args.output):
-            print("✅ Repaired XML saved successfully")
+            if repair_tool.modified or args.output:
+                print("✅ Repaired XML saved successfully")
+            else:
+                print("✅ Repairs made no changes - repaired XML not written")
         else:
             print("❌ Failed to save repaired XML")
             sys.exit(1)
@@ -0,0 +1,60 @@
+"""Tests for fix_report_xml.py (run with: python -m unittest discover -s tools/tests)"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as StdET
+from unittest import mock
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOLS_DIR)
+
+import fix_report_xml as frx  # noqa: E402
+
+CDATA_TEXT = "if a < b then x && y > 'z'"
+CDATA_REPORT = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<SASReport xmlns="http://www.sas.com/sasreportmodel/bird-4.1.4" nextUniqueNameIndex="5">'
+    '<DataItem name="dd1"/><DataItem name="dd1"/>'
+    f'<Template><![CDATA[{CDATA_TEXT}]]></Template>'
+    '</SASReport>'
+)
+
+
+class CdataRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def fix_report(self) -> bytes:
+        input_path = os.path.join(self.tmpdir, "report.xml")
+        output_path = os.path.join(self.tmpdir, "fixed.xml")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write(CDATA_REPORT)
+        with mock.patch.object(sys, "argv", ["fix_report_xml.py", input_path, output_path]), \
+                contextlib.redirect_stdout(io.StringIO()):
+            frx.main()
+        with open(output_path, "rb") as f:
+            return f.read()
+
+    @unittest.skipUnless(frx.HAVE_LXML, "CDATA sections are kept only with lxml")
+    def test_lxml_keeps_cdata_sections(self):
+        output = self.fix_report()
+        self.assertIn(f"<![CDATA[{CDATA_TEXT}]]>".encode("utf-8"), output)
+        root = StdET.fromstring(output)
+        template = root.find("{http://www.sas.com/sasreportmodel/bird-4.1.4}Template")
+        self.assertEqual(template.text, CDATA_TEXT)
+
+    def test_cdata_with_markup_characters_reparses(self):
+        root = StdET.fromstring(self.fix_report())
+        template = root.find("{http://www.sas.com/sasreportmodel/bird-4.1.4}Template")
+        self.assertEqual(template.text, CDATA_TEXT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Tests for har_analyzer.py (run with: python -m unittest discover -s tools/tests)"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOLS_DIR)
+
+import har_analyzer as ha  # noqa: E402
+
+
+def analyze_times(times):
+    analyzer = ha.HARAnalyzer({'log': {'entries': [{'time': t} for t in times]}})
+    analyzer.analyze()
+    return analyzer.stats['average_response_time']
+
+
+class AverageResponseTimeTest(unittest.TestCase):
+
+    def test_whole_mean_of_integer_times_stays_int(self):
+        average = analyze_times([2, 4])
+        self.assertEqual(average, 3)
+        self.assertIsInstance(average, int)
+
+    def test_fractional_mean_is_rounded(self):
+        self.assertEqual(analyze_times([1, 1, 2]), 1.33)
+        self.assertEqual(analyze_times([2.5, 3.5]), 3.0)
+
+
+# Optional parsers switched off per load path, fastest first; the last one is stdlib json
+BACKENDS = {
+    'ijson': (),
+    'orjson': ('ijson',),
+    'json': ('ijson', 'orjson'),
+}
+
+
+class BackendConsistencyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def write_har(self, content: str) -> str:
+        path = os.path.join(self.tmpdir, "test.har")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def run_backends(self, path: str):
+        """main()'s stdout and exit code for each available load path"""
+        results = {}
+        for backend, disabled in BACKENDS.items():
+            if backend != 'json' and getattr(ha, backend) is None:
+                continue
+            with contextlib.ExitStack() as stack:
+                for module in disabled:
+                    stack.enter_context(mock.patch.object(ha, module, None))
+                stack.enter_context(mock.patch.object(sys, 'argv', ['har_analyzer.py', path]))
+                out = stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                with self.assertRaises(SystemExit) as cm:
+                    ha.main()
+            results[backend] = (out.getvalue(), cm.exception.code)
+        return results
+
+    def assert_all_backends(self, content: str, expected: str):
+        for backend, result in self.run_backends(self.write_har(content)).items():
+            with self.subTest(backend=backend):
+                self.assertEqual(result, (expected + "\n", 1))
+
+    def test_null_time_reported_the_same_by_every_backend(self):
+        self.assert_all_backends('{"log": {"entries": [{"time": 1}, {"time": null}]}}',
+                                 "Error: Invalid HAR file: unexpected value type in log.entries[1]")
+
+    def test_non_object_entry_reported_the_same_by_every_backend(self):
+        self.assert_all_backends('{"log": {"entries": [{}, 5]}}',
+                                 "Error: Invalid HAR file: unexpected value type in log.entries[1]")
+
+    def test_malformed_json_reported_the_same_by_every_backend(self):
+        self.assert_all_backends('{"log": {"entries": [{"time": 1},]}}',
+                                 "Error: Invalid JSON in HAR file")
+
+    @unittest.skipIf(ha.ijson is None, "ijson not installed")
+    def test_streamed_invalid_json_raises_from_the_analyzer(self):
+        har_data = ha.load_har_file(self.write_har('{"log": {"entries": [{"time": 1}, {"time": 2,]}}'))
+        with self.assertRaises(ha.ijson.JSONError):
+            ha.HARAnalyzer(har_data).analyze()
+
+    def test_without_optional_parsers_falls_back_to_json(self):
+        path = self.write_har('{"log": {"entries": [{"time": 2, "response": {"status": 200}}]}}')
+        with mock.patch.object(ha, 'ijson', None), mock.patch.object(ha, 'orjson', None):
+            har_data = ha.load_har_file(path)
+        self.assertIsInstance(har_data['log']['entries'], list)
+        analyzer = ha.HARAnalyzer(har_data)
+        analyzer.analyze()
+        self.assertEqual(analyzer.stats['total_requests'], 1)
+        self.assertEqual(analyzer.stats['successful_requests'], 1)
+
+
+
+class SaveResultsTest(unittest.TestCase):
+
+    def test_results_file_matches_json_dump(self):
+        output_data = {
+            'timestamp': '2024-01-01T00:00:00',
+            'statistics': {'average_response_time': 1e17, 'min_response_time': 1.5e-7},
+            'issues': [{'title': 'Größe', 'details': {'urls': ['https://a/'], 'count': 2}}],
+        }
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        ha.save_results(path, output_data)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(output_data, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
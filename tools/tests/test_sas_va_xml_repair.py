@@ -0,0 +1,117 @@
+"""Tests for sas_va_xml_repair.py (run with: python -m unittest discover -s tools/tests)"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOLS_DIR)
+
+import sas_va_xml_repair as sva  # noqa: E402
+
+SAMPLE_REPORT = os.path.join(os.path.dirname(TOOLS_DIR), "Vertriebsreporting.xml")
+
+# Root children of the sample report that are not object type sections
+NON_OBJECT_SECTIONS = ("View", "MediaTargets", "Properties", "ExportProperties",
+                       "Localization", "History", "SASReportState")
+
+
+def child_names(root):
+    return [sva._localname(child.tag) for child in root]
+
+
+class CorruptedReportRepairTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def write_report(self, malformed: bool) -> str:
+        with open(SAMPLE_REPORT, encoding="utf-8") as f:
+            content = f.read()
+        if malformed:
+            # A bare '&' in text: a small glitch lxml recovers from
+            content = content.replace("</History>", "R&D</History>", 1)
+        path = os.path.join(self.tmpdir, "report.xml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def repair_and_save(self, path: str):
+        repair_tool = sva.BIRDXMLRepair(path)
+        self.assertTrue(repair_tool.load_xml())
+        original_children = child_names(repair_tool.root)
+        original_attributes = dict(repair_tool.root.items())
+        self.assertTrue(repair_tool.repair_corrupted_report())
+        output_path = os.path.join(self.tmpdir, "out.xml")
+        self.assertTrue(repair_tool.save_xml(output_path))
+        return repair_tool, original_children, original_attributes, output_path
+
+    def test_repair_keeps_non_object_sections(self):
+        repair_tool, original_children, original_attributes, output_path = \
+            self.repair_and_save(self.write_report(malformed=False))
+        self.assertEqual(child_names(repair_tool.root), original_children)
+        self.assertEqual(dict(repair_tool.root.items()), original_attributes)
+        with open(output_path, encoding="utf-8") as f:
+            saved = f.read()
+        for section in NON_OBJECT_SECTIONS:
+            self.assertIn(f"<{section}", saved)
+
+    @unittest.skipUnless(sva.HAVE_LXML, "recover mode needs lxml")
+    def test_malformed_report_repair_keeps_non_object_sections(self):
+        repair_tool, original_children, _, output_path = \
+            self.repair_and_save(self.write_report(malformed=True))
+        self.assertTrue(repair_tool.recovered_errors)
+        for section in NON_OBJECT_SECTIONS:
+            self.assertIn(section, original_children)
+            self.assertIn(section, child_names(repair_tool.root))
+        with open(output_path, encoding="utf-8") as f:
+            saved = f.read()
+        for section in NON_OBJECT_SECTIONS:
+            self.assertIn(f"<{section}", saved)
+
+    @unittest.skipUnless(sva.HAVE_LXML, "recover mode needs lxml")
+    def test_recovered_errors_do_not_trigger_corrupted_repair(self):
+        repair_tool = sva.BIRDXMLRepair(self.write_report(malformed=True))
+        self.assertTrue(repair_tool.load_xml())
+        categories = {category for category, _ in repair_tool.analyze_xml_structure()['potential_issues']}
+        self.assertIn(sva.IssueCategory.RECOVERED_ERRORS, categories)
+        self.assertNotIn(sva.IssueCategory.CORRUPTED, categories)
+
+    @unittest.skipUnless(sva.HAVE_LXML, "recover mode needs lxml")
+    def test_recovered_duplicate_attribute_is_not_saved(self):
+        path = os.path.join(self.tmpdir, "report.xml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0"?>\n<SASReport xmlns="http://www.sas.com/sasreportmodel/bird-4.1.4" '
+                    'nextUniqueNameIndex="5"><DataDefinitions>'
+                    '<DataItem name="dd1" expression="${dd9} + x" expression=""/><DataItem name="dd1"/>'
+                    '</DataDefinitions></SASReport>')
+        repair_tool = sva.BIRDXMLRepair(path)
+        self.assertTrue(repair_tool.load_xml())
+        self.assertTrue(repair_tool.recovered_errors)
+        repair_tool.repair_duplicate_names()
+        output_path = os.path.join(self.tmpdir, "out.xml")
+        with self.assertLogs(sva.logger, "ERROR"):
+            self.assertFalse(repair_tool.save_xml(output_path))
+        self.assertFalse(os.path.exists(output_path))
+
+
+class AnalysisTest(unittest.TestCase):
+
+    def test_wrong_root_is_reported_corrupted(self):
+        fd, path = tempfile.mkstemp(suffix=".xml")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0"?>\n<Report xmlns="http://www.sas.com/sasreportmodel/bird-4.1.2">'
+                    '<DataDefinitions/></Report>')
+        repair_tool = sva.BIRDXMLRepair(path)
+        self.assertTrue(repair_tool.load_xml())
+        for analysis in (repair_tool.analyze_xml_structure(), sva.analyze_only(path)):
+            categories = {category for category, _ in analysis['potential_issues']}
+            self.assertIn(sva.IssueCategory.CORRUPTED, categories)
+
+
+if __name__ == "__main__":
+    unittest.main()